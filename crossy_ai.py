@@ -0,0 +1,197 @@
+""" A path-planning AI that plays the game by predicting every vehicle.
+
+Vehicles move at a constant whole number of pixels per frame, so each lane's future is
+known until one of its vehicles wraps around and respawns at a random gap. LaneTable
+caches, per lane, which columns are dangerous on every frame of a fixed horizon; after
+the first predicted respawn it assumes the whole range of possible gaps. A table is
+rebuilt only when its lane is new, when that respawn actually happens (the gap is then
+known), or when the horizon runs out.
+
+Every DECISION_FRAMES frames the planner searches a time-expanded grid (lane, column,
+tick) for the highest row it can still be standing on PLAN_TICKS ticks from now. The
+search is a breadth-first sweep where each tick's frontier is one Python int bitboard
+(bit lane * STRIDE + column): the safe cells of every tick are packed into bitboards up
+front with np.packbits, and a tick costs a few shifts, ORs and one AND. Rows the auto
+scroll will have pushed off the bottom of the screen count as unsafe.
+
+    python crossy_roads.py --ai                                   # watch it play
+    python crossy_runner.py --policies crossy_ai:planner_policy --seeds 0-99
+"""
+import numpy as np
+
+from crossy_roads import (SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, PLAYER_SIZE, SCROLL_DELAY_FRAMES,
+                          ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN, HITBOX_INSET, HITBOX_SIZE,
+                          row_y, row_at, trajectory)
+
+DECISION_FRAMES = 3 # Frames between decisions (at most 20 hops a second)
+PLAN_TICKS = 24 # Decisions searched ahead
+RESPAWN_GAP = (10, 100) # Vehicle.update() respawns this far off screen
+COLUMNS = SCREEN_WIDTH // GRID_SIZE
+
+STRIDE = COLUMNS + 1 # Bits per row in a frontier bitboard; the spare bit stops sideways wrap
+
+# Player hitbox span in each column
+HIT_LEFT = np.arange(COLUMNS) * GRID_SIZE + HITBOX_INSET
+HIT_RIGHT = HIT_LEFT + HITBOX_SIZE
+
+class LaneTable:
+    """ Columns each vehicle of a lane makes unsafe, per tick-long window of frames.
+        Vehicles are tracked separately so a respawn rebuilds only the one that respawned """
+    def __init__(self, lane, frame, frames_per_tick, horizon):
+        self.lane = lane
+        self.frames_per_tick = frames_per_tick
+        self.horizon = horizon
+        self.tracks = [self.track(v, frame) for v in lane.vehicles]
+        self.builds = len(self.tracks)
+
+    def track(self, v, frame):
+        """ (base_frame, exact_until, windows) where windows[j] marks the columns hit at any
+            frame from base_frame + j to base_frame + j + frames_per_tick - 1 """
+        n = self.horizon + 1
+        x, w, speed = v.rect.x, v.rect.width, v.speed
+        lo = np.empty(n, dtype=np.int64)
+        lo[0] = x
+        lo[1:] = trajectory(x, speed, n - 1)
+        hi = lo.copy()
+        exact_until = frame + n
+        cutoff = n
+
+        # After a respawn the gap is unknown: track the nearest and farthest possible spot
+        if speed > 0: exited = lo > SCREEN_WIDTH
+        else: exited = lo + w < 0
+        if exited.any():
+            e = int(exited.argmax())
+            exact_until = frame + e
+            if speed > 0: near, far = -RESPAWN_GAP[0] - w, -RESPAWN_GAP[1] - w
+            else: near, far = SCREEN_WIDTH + RESPAWN_GAP[0], SCREEN_WIDTH + RESPAWN_GAP[1]
+            lo[e], hi[e] = min(near, far), max(near, far)
+            lo[e + 1:] = trajectory(lo[e], speed, n - e - 1)
+            hi[e + 1:] = trajectory(hi[e], speed, n - e - 1)
+            if speed > 0: gone = hi > SCREEN_WIDTH
+            else: gone = lo + w < 0
+            gone[:e] = False
+            if gone.any(): cutoff = int(gone.argmax())
+
+        danger = (lo[:, None] < HIT_RIGHT) & (hi[:, None] + w > HIT_LEFT)
+        danger[cutoff:] = True # A second respawn within the horizon is anybody's guess
+        d = self.frames_per_tick
+        windows = danger[:n - d + 1].copy()
+        for i in range(1, d): windows |= danger[i:n - d + 1 + i]
+        return frame, exact_until, windows
+
+    def refresh(self, frame, needed):
+        """ Rebuilds the tracks whose respawn happened or whose horizon ends before frame + needed """
+        vehicles = self.lane.vehicles
+        if len(vehicles) != len(self.tracks):
+            self.tracks = [self.track(v, frame) for v in vehicles]
+            self.builds += len(vehicles)
+            return
+        for i, (base, exact_until, windows) in enumerate(self.tracks):
+            if frame >= exact_until or frame + 1 - base + needed > len(windows):
+                self.tracks[i] = self.track(vehicles[i], frame)
+                self.builds += 1
+
+    def unsafe_ticks(self, frame, ticks):
+        """ (ticks, COLUMNS): columns hit during each of the ticks starting at frame + 1 """
+        d = self.frames_per_tick
+        unsafe = np.zeros((ticks, COLUMNS), dtype=bool)
+        for base, _, windows in self.tracks:
+            start = frame + 1 - base
+            unsafe |= windows[start:start + ticks * d:d]
+        return unsafe
+
+def spread(board):
+    """ Cells reachable from a frontier bitboard with one hop or by standing still. Sideways
+        hops off the grid land on spare bits, which the next safe-board mask clears """
+    return board | (board << STRIDE) | (board >> STRIDE) | (board << 1) | (board >> 1)
+
+class PathPlanner:
+    """ A controller: planner(state) -> action. Works for game_loop and headless GameStates """
+    def __init__(self, decision_frames=DECISION_FRAMES, plan_ticks=PLAN_TICKS):
+        self.decision_frames = decision_frames
+        self.plan_ticks = plan_ticks
+        self.horizon = 2 * plan_ticks * decision_frames # Frames a table covers before it is rebuilt
+        self.tables = {} # lane row -> LaneTable
+        self.state = None
+
+    @property
+    def builds(self):
+        """ Vehicle tracks built so far by the live tables """
+        return sum(t.builds for t in self.tables.values())
+
+    def __call__(self, state):
+        if state is not self.state or state.frame == 0:
+            self.state = state
+            self.tables.clear()
+        if state.game_over or state.frame % self.decision_frames: return ACTION_NONE
+        return self.plan(state)
+
+    def table(self, lane, frame):
+        table = self.tables.get(lane.row)
+        if table is None or table.lane is not lane:
+            table = self.tables[lane.row] = LaneTable(lane, frame, self.decision_frames, self.horizon)
+        else:
+            table.refresh(frame, self.plan_ticks * self.decision_frames)
+        return table
+
+    def plan(self, state):
+        lanes = state.lanes
+        frame = state.frame
+        ticks, per_tick = self.plan_ticks, self.decision_frames
+        bottom = lanes[0].row
+        for row in [r for r in self.tables if r < bottom]: del self.tables[row]
+
+        # safe[tick, lane index, column]; the spare last column stays False
+        safe = np.zeros((ticks, len(lanes), STRIDE), dtype=bool)
+        safe[:, :, :COLUMNS] = True
+        for i, lane in enumerate(lanes):
+            if lane.vehicles: safe[:, i, :COLUMNS] = ~self.table(lane, frame).unsafe_ticks(frame, ticks)
+
+        # The auto scroll kills a row once its player's bottom edge reaches the screen bottom
+        scroll = min(3.0, 0.5 + state.difficulty_level * 0.1)
+        tick_end = frame + per_tick * np.arange(1, ticks + 1)
+        scrolled_frames = np.maximum(0, tick_end - max(frame, SCROLL_DELAY_FRAMES))
+        camera = state.camera_y + scroll * scrolled_frames + 1 # +1 for the carried fraction
+        player_bottom = np.array([row_y(lane.row) - 5 + PLAYER_SIZE for lane in lanes])
+        safe &= (player_bottom[None, :] + camera[:, None] < SCREEN_HEIGHT)[:, :, None]
+
+        rect = state.player.rect
+        start_row, start_col = row_at(rect.centery) - bottom, min(COLUMNS - 1, rect.x // GRID_SIZE)
+        if not 0 <= start_row < len(lanes): return ACTION_NONE
+
+        # Breadth-first over ticks on bitboards (bit row * STRIDE + col): frontier[k] holds
+        # every cell the chicken can be standing on during tick k
+        packed = np.packbits(safe.reshape(ticks, -1), axis=1, bitorder="little")
+        frontier = []
+        board = 1 << (start_row * STRIDE + start_col)
+        for k in range(ticks):
+            board = spread(board) & int.from_bytes(packed[k].tobytes(), "little")
+            if not board: break
+            frontier.append(board)
+        if not frontier: return ACTION_NONE
+
+        # Goal: the highest row still alive at the last tick, nearest the middle column
+        row = (frontier[-1].bit_length() - 1) // STRIDE
+        cols = (frontier[-1] >> (row * STRIDE)) & ((1 << COLUMNS) - 1)
+        col = min((c for c in range(COLUMNS) if cols >> c & 1), key=lambda c: abs(c - COLUMNS // 2))
+        cell = row * STRIDE + col
+
+        # Walk back to the first hop, preferring to have stood still
+        for board in reversed(frontier[:-1]):
+            for prev in (cell, cell - STRIDE, cell + STRIDE, cell - 1, cell + 1):
+                if prev >= 0 and board >> prev & 1:
+                    cell = prev
+                    break
+        return hop_action((start_row, start_col), divmod(cell, STRIDE))
+
+def hop_action(start, cell):
+    dr, dc = cell[0] - start[0], cell[1] - start[1]
+    if dr > 0: return ACTION_UP
+    if dr < 0: return ACTION_DOWN
+    if dc > 0: return ACTION_RIGHT
+    if dc < 0: return ACTION_LEFT
+    return ACTION_NONE
+
+def planner_policy(seed):
+    """ crossy_runner policy factory """
+    return PathPlanner()
@@ -0,0 +1,242 @@
+""" Vectorized batch simulator: thousands of independent games stepped at once.
+
+Every game lives in NumPy struct-of-arrays (lane type/row/speed, vehicle x/width/kind,
+player x/y) and each rule of GameState.step - movement, wrap-around respawns, auto scroll,
+lane spawning and hitbox collision - advances all games in a single vectorized pass.
+"""
+import numpy as np
+
+from crossy_roads import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, PLAYER_SIZE, CAR_HEIGHT,
+    SCROLL_THRESHOLD, SCROLL_DELAY_FRAMES, ACTION_DX, ACTION_DY, LANE_TYPES, LANE_TYPE_INDEX,
+    VEHICLE_TYPES, DEATH_CAUSES, CAUSE_SCROLLED, HITBOX_INSET, HITBOX_SIZE, rect_round,
+)
+
+LANE_GRASS, LANE_ROAD, LANE_RAIL = (LANE_TYPE_INDEX[t] for t in ('grass', 'road', 'rail')) # lane_type values index LANE_TYPES
+KIND_CAR, KIND_TRUCK, KIND_TRAIN = 0, 1, 2
+
+LANE_SLOTS = 16     # ring buffer of lanes per game, indexed by row % LANE_SLOTS
+VEHICLE_SLOTS = 3   # roads hold at most 3 vehicles, rails exactly one train
+START_LANES = int(SCREEN_HEIGHT / GRID_SIZE) + 2
+
+BASE_SPEEDS = np.array([-5, -4, -3, 3, 4, 5], dtype=np.float64)
+CAR_WIDTH = 70
+TRAIN_WIDTH = 900
+
+class BatchGame:
+    """ N games advanced together. step(actions) takes one action per game and
+        returns (rewards, dones); finished games stay frozen until reset() """
+    def __init__(self, n, seed=None, auto_reset=False):
+        self.n = n
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        # Player / progress
+        self.player_x = np.zeros(n, dtype=np.int32)
+        self.player_y = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.total_scroll_y = np.zeros(n, dtype=np.int64)
+        self.camera = np.zeros(n, dtype=np.int64) # every pixel scrolled, auto or player driven
+        self.scroll_accumulator = np.zeros(n, dtype=np.float64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.death_cause = np.full(n, -1, dtype=np.int8)
+
+        # Lanes: slot = row % LANE_SLOTS
+        self.bottom_row = np.zeros(n, dtype=np.int64)
+        self.top_row = np.zeros(n, dtype=np.int64)
+        self.lane_row = np.full((n, LANE_SLOTS), -1, dtype=np.int64)
+        self.lane_type = np.zeros((n, LANE_SLOTS), dtype=np.int8)
+        self.lane_speed = np.zeros((n, LANE_SLOTS), dtype=np.float64)
+
+        # Vehicles
+        self.veh_active = np.zeros((n, LANE_SLOTS, VEHICLE_SLOTS), dtype=bool)
+        self.veh_x = np.zeros((n, LANE_SLOTS, VEHICLE_SLOTS), dtype=np.int32)
+        self.veh_w = np.zeros((n, LANE_SLOTS, VEHICLE_SLOTS), dtype=np.int32)
+        self.veh_kind = np.zeros((n, LANE_SLOTS, VEHICLE_SLOTS), dtype=np.int8)
+
+        self._all = np.arange(n)
+        self.reset()
+
+    @property
+    def difficulty_level(self):
+        return self.score // 100
+
+    def lane_y(self):
+        """ Screen y of every lane slot, shape (n, LANE_SLOTS) """
+        return SCREEN_HEIGHT - self.lane_row * GRID_SIZE + self.camera[:, None]
+
+    def reset(self, mask=None):
+        """ Restarts the games selected by a boolean mask (all games by default) """
+        idx = self._all if mask is None else np.flatnonzero(mask)
+        if len(idx) == 0: return
+        self.player_x[idx] = SCREEN_WIDTH // 2
+        self.player_y[idx] = SCREEN_HEIGHT - GRID_SIZE - 5
+        for arr in (self.score, self.total_scroll_y, self.camera, self.frame, self.bottom_row):
+            arr[idx] = 0
+        self.scroll_accumulator[idx] = 0.0
+        self.done[idx] = False
+        self.death_cause[idx] = -1
+        self.lane_row[idx] = -1
+        self.veh_active[idx] = False
+
+        level = np.zeros(len(idx), dtype=np.int64)
+        for row in range(START_LANES):
+            types = np.full(len(idx), LANE_GRASS, dtype=np.int8) if row < 4 else self._random_lane_types(level)
+            self._spawn(idx, np.full(len(idx), row), types, level)
+        self.top_row[idx] = START_LANES - 1
+
+    def _random_lane_types(self, level):
+        """ Vectorized get_random_lane_type """
+        rnd = self.rng.random(len(level))
+        grass_chance = np.maximum(0.1, 0.4 - level * 0.03)
+        rail_chance = np.minimum(0.3, 0.1 + level * 0.02)
+        types = np.full(len(level), LANE_GRASS, dtype=np.int8)
+        types[rnd < 1.0 - grass_chance] = LANE_ROAD
+        types[rnd < rail_chance] = LANE_RAIL
+        return types
+
+    def _spawn(self, idx, rows, types, level):
+        """ Builds one lane per selected game, following Lane.__init__ """
+        k = len(idx)
+        rng = self.rng
+        slot = rows % LANE_SLOTS
+        self.lane_row[idx, slot] = rows
+        self.lane_type[idx, slot] = types
+        speed = rng.choice(BASE_SPEEDS, k) * (1.0 + level * 0.1)
+        self.lane_speed[idx, slot] = speed
+        self.veh_active[idx, slot] = False
+
+        # Roads: 1-3 vehicles placed at least 200px apart, 10 attempts each
+        road = types == LANE_ROAD
+        count = np.where(rng.random(k) < 0.8, 1, 2)
+        count = np.where(level >= 3, rng.integers(1, 3, k), count)
+        count = np.where(level >= 6, rng.integers(2, 4, k), count)
+        placed_x = np.zeros((k, VEHICLE_SLOTS), dtype=np.int32)
+        placed = np.zeros((k, VEHICLE_SLOTS), dtype=bool)
+        n_placed = np.zeros(k, dtype=np.int64)
+        for j in range(VEHICLE_SLOTS):
+            want = road & (count > j)
+            found = np.zeros(k, dtype=bool)
+            start_x = np.zeros(k, dtype=np.int32)
+            for _ in range(10):
+                cand = rng.integers(0, SCREEN_WIDTH + 1, k)
+                clear = np.all(~placed | (np.abs(cand[:, None] - placed_x) > 200), axis=1)
+                take = want & ~found & clear
+                start_x[take] = cand[take]
+                found |= take
+            slot_j = n_placed
+            sel = np.flatnonzero(found)
+            placed_x[sel, slot_j[sel]] = start_x[sel]
+            placed[sel, slot_j[sel]] = True
+            n_placed[sel] += 1
+
+        is_truck = rng.random((k, VEHICLE_SLOTS)) >= 0.7
+        truck_w = rng.integers(110, 181, (k, VEHICLE_SLOTS))
+        width = np.where(is_truck, truck_w, CAR_WIDTH)
+        kind = np.where(is_truck, KIND_TRUCK, KIND_CAR)
+
+        # Rails: one train entering from off screen
+        rail = types == LANE_RAIL
+        train_speed = rng.choice(np.array([-15.0, 15.0]), k) * (1 + level * 0.05)
+        speed = np.where(rail, train_speed, speed)
+        self.lane_speed[idx, slot] = speed
+        train_x = np.where(train_speed > 0, -TRAIN_WIDTH, SCREEN_WIDTH + 200)
+        placed_x[rail, 0] = train_x[rail]
+        placed[rail, 0] = True
+        placed[rail, 1:] = False
+        width[rail, 0] = TRAIN_WIDTH
+        kind[rail, 0] = KIND_TRAIN
+
+        self.veh_active[idx, slot] = placed
+        self.veh_x[idx, slot] = placed_x
+        self.veh_w[idx, slot] = width
+        self.veh_kind[idx, slot] = kind
+
+    def step(self, actions):
+        """ Advances every live game by one frame """
+        actions = np.asarray(actions, dtype=np.int64)
+        live = ~self.done
+        prev_score = self.score.copy()
+        level = self.difficulty_level
+
+        # Player input
+        dx = np.where(live, ACTION_DX[actions], 0)
+        dy = np.where(live, ACTION_DY[actions], 0)
+        self.player_x = np.clip(self.player_x + dx, 0, SCREEN_WIDTH - PLAYER_SIZE).astype(np.int32)
+        self.player_y += dy.astype(np.int32)
+        self.frame += live
+
+        # Auto scroll (with delay)
+        scrolling = live & (self.frame > SCROLL_DELAY_FRAMES)
+        auto_speed = np.minimum(3.0, 0.5 + level * 0.1)
+        self.scroll_accumulator += np.where(scrolling, auto_speed, 0.0)
+        px = np.floor(self.scroll_accumulator).astype(np.int64)
+        self.scroll_accumulator -= px
+        self.player_y += px.astype(np.int32)
+        self.camera += px
+
+        # Player input scroll
+        amount = np.where(live, np.maximum(0, SCROLL_THRESHOLD - self.player_y), 0)
+        self.player_y += amount.astype(np.int32)
+        self.total_scroll_y += amount
+        self.camera += amount
+        self.score = (self.total_scroll_y // GRID_SIZE) * 10
+
+        # Death check
+        fell = live & (self.player_y + PLAYER_SIZE >= SCREEN_HEIGHT)
+        self.death_cause[fell & (self.death_cause < 0)] = CAUSE_SCROLLED
+
+        # Lane management: cull lanes below the screen, spawn one above
+        while True:
+            bottom_y = SCREEN_HEIGHT - self.bottom_row * GRID_SIZE + self.camera
+            cull = live & (bottom_y >= SCREEN_HEIGHT)
+            if not cull.any(): break
+            sel = np.flatnonzero(cull)
+            slot = self.bottom_row[sel] % LANE_SLOTS
+            self.lane_row[sel, slot] = -1
+            self.veh_active[sel, slot] = False
+            self.bottom_row[sel] += 1
+        top_y = SCREEN_HEIGHT - self.top_row * GRID_SIZE + self.camera
+        sel = np.flatnonzero(live & (top_y > -GRID_SIZE))
+        if len(sel):
+            self.top_row[sel] += 1
+            self._spawn(sel, self.top_row[sel], self._random_lane_types(level[sel]), level[sel])
+
+        # Vehicle movement and wrap-around
+        moving = self.veh_active & live[:, None, None]
+        speed = self.lane_speed[:, :, None]
+        new_x = rect_round(self.veh_x + speed).astype(np.int32) # not np.rint: Rect rounds halves away from zero
+        x = np.where(moving, new_x, self.veh_x)
+        gap = self.rng.integers(10, 101, x.shape, dtype=np.int32)
+        wrap_right = moving & (speed > 0) & (x > SCREEN_WIDTH)
+        wrap_left = moving & (speed < 0) & (x + self.veh_w < 0)
+        x = np.where(wrap_right, -self.veh_w - gap, x)
+        x = np.where(wrap_left, SCREEN_WIDTH + gap, x)
+        self.veh_x = x
+
+        # Collision: only the rows the hitbox spans
+        hx = self.player_x + HITBOX_INSET
+        hy = self.player_y + HITBOX_INSET
+        hit_cause = np.full(self.n, -1, dtype=np.int8)
+        for edge in (hy, hy + HITBOX_SIZE - 1):
+            row = (SCREEN_HEIGHT + self.camera - edge + GRID_SIZE - 1) // GRID_SIZE
+            slot = row % LANE_SLOTS
+            valid = self.lane_row[self._all, slot] == row
+            vy = SCREEN_HEIGHT - row * GRID_SIZE + self.camera + 5
+            vx = self.veh_x[self._all, slot]
+            vw = self.veh_w[self._all, slot]
+            overlap = (self.veh_active[self._all, slot]
+                       & (hx[:, None] < vx + vw) & (vx < (hx + HITBOX_SIZE)[:, None])
+                       & (hy < vy + CAR_HEIGHT)[:, None] & (vy < hy + HITBOX_SIZE)[:, None])
+            hit = live & valid & overlap.any(axis=1)
+            first = overlap.argmax(axis=1)
+            kinds = self.veh_kind[self._all, slot, first]
+            hit_cause = np.where(hit & (hit_cause < 0), kinds, hit_cause)
+        self.death_cause = np.where((self.death_cause < 0) & live, hit_cause, self.death_cause).astype(np.int8)
+
+        self.done |= live & (self.death_cause >= 0)
+        rewards = self.score - prev_score
+        dones = self.done.copy()
+        if self.auto_reset: self.reset(dones)
+        return rewards, dones
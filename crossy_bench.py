@@ -0,0 +1,303 @@
+""" Reproducible benchmarks for the simulation and rendering hot paths.
+
+Runs under the SDL dummy video driver with fixed seeds, reports operations (frames)
+per second, the Python memory each operation keeps (retained blocks) and its peak of
+temporary memory, and the Surfaces it creates, and compares against a stored baseline
+so regressions show up.
+
+Absolute speeds differ between machines, so every run also times a fixed pure-Python
+reference case and each case is gated on its speed relative to that reference. The
+gate is still tightest against a baseline recorded on the same machine: record your
+own with --save-baseline before changing code.
+
+    python crossy_bench.py                  # run and compare with bench_baseline.json
+    python crossy_bench.py --save-baseline  # record a new baseline on this machine
+    python crossy_bench.py -k frame         # only cases whose name contains "frame"
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+import crossy_roads as cr
+from crossy_multi import SharedGame
+from crossy_pixels import PixelRenderer
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+REGRESSION_TOLERANCE = 0.20 # Slower than baseline by more than this fails the run
+REFERENCE_CASE = "reference"
+BENCH_SEED = 1234
+
+# --- Fixtures ---
+
+def leveled_state(level, seed=BENCH_SEED):
+    """ A textured GameState whose lanes and scroll speed are already at a difficulty level """
+    state = cr.GameState(seed, textured=True)
+    state.total_scroll_y = level * 10 * cr.GRID_SIZE
+    state.score = level * 100
+    state.frame = cr.SCROLL_DELAY_FRAMES
+    for i, lane in enumerate(state.lanes):
+        if lane.row >= cr.START_GRASS_ROWS:
+            state.lanes[i] = state.lane_stream.build(lane.row, level)
+    return state
+
+def explosion_props(seed=BENCH_SEED):
+    """ Every on-screen lane packed with vehicles, wrapped as GameOverProps """
+    rng = random.Random(seed)
+    props = []
+    for row in range(int(cr.SCREEN_HEIGHT / cr.GRID_SIZE)):
+        y = cr.row_y(row) - cr.GRID_SIZE + 5
+        if row % 4 == 3:
+            props.append(cr.GameOverProp(cr.Vehicle(rng.randint(-300, 0), y, 15, "train", rng), rng.getrandbits(32)))
+            continue
+        for x in range(0, cr.SCREEN_WIDTH, 200):
+            v_type = "car" if rng.random() < 0.7 else "truck"
+            props.append(cr.GameOverProp(cr.Vehicle(x, y, rng.choice([-4, 4]), v_type, rng), rng.getrandbits(32)))
+    return props
+
+# --- Cases: each returns a zero-argument callable performing one operation ---
+
+def case_lane(lane_type):
+    rng = random.Random(BENCH_SEED)
+    return lambda: cr.Lane(0, lane_type, 5, rng, True)
+
+def case_lane_texture(lane_type):
+    rng = random.Random(BENCH_SEED)
+    return lambda: cr.generate_lane_texture(lane_type, rng)
+
+def case_vehicle_draw(v_type):
+    screen = pygame.display.get_surface()
+    vehicle = cr.Vehicle(100, 300, 4, v_type, random.Random(BENCH_SEED))
+    return lambda: vehicle.draw(screen)
+
+def case_egg():
+    screen = pygame.display.get_surface()
+    return lambda: cr.draw_realistic_egg(screen, 200, 300)
+
+def case_egg_render():
+    seeds = iter(range(10**9))
+    return lambda: cr.render_egg(next(seeds))
+
+def case_chicken(scale):
+    screen = pygame.display.get_surface()
+    rect = pygame.Rect(300, 300, cr.PLAYER_SIZE, cr.PLAYER_SIZE)
+    return lambda: cr.draw_chicken(screen, rect, True, scale)
+
+def case_frame(level):
+    """ One full update + draw frame at a difficulty level; deaths restart the same level """
+    screen = pygame.display.get_surface()
+    policy = random.Random(BENCH_SEED)
+    state = [leveled_state(level)]
+    def frame():
+        s = state[0]
+        if s.game_over: s = state[0] = leveled_state(level)
+        s.step(cr.ACTION_UP if policy.random() < 0.05 else cr.ACTION_NONE)
+        cr.draw_world(screen, s)
+        s.player.draw(screen, s.camera_y)
+    return frame
+
+def case_reference():
+    """ Fixed pure-Python work no game code touches: the yardstick for this machine's speed """
+    data = list(range(2000))
+    random.Random(BENCH_SEED).shuffle(data)
+    def work():
+        sorted(data)
+        sum(x * x for x in data)
+    return work
+
+def case_headless_step():
+    state = [cr.GameState(BENCH_SEED)]
+    def step():
+        s = state[0]
+        if s.game_over: s.reset(BENCH_SEED)
+        s.step(cr.ACTION_NONE)
+    return step
+
+def case_shared_step(agents):
+    """ One SharedGame tick with agents all hopping at random; game over restarts it """
+    game = SharedGame(agents, BENCH_SEED)
+    rng = np.random.default_rng(BENCH_SEED)
+    actions = rng.choice(5, (1024, agents), p=[0.85, 0.03, 0.03, 0.08, 0.01])
+    def step():
+        if game.game_over: game.reset(BENCH_SEED)
+        game.step(actions[game.frame % len(actions)])
+    return step
+
+def case_pixels(size, grayscale):
+    """ One downsampled observation of a textured game that keeps hopping forward """
+    renderer = PixelRenderer(*size, grayscale=grayscale)
+    state = [leveled_state(0)]
+    def render():
+        s = state[0]
+        if s.game_over: s = state[0] = leveled_state(0)
+        s.step(cr.ACTION_UP if s.frame % 20 == 0 else cr.ACTION_NONE)
+        renderer.render(s)
+    return render
+
+def case_explosion():
+    """ One game-over frame with a full screen of props exploding into eggs """
+    screen = pygame.display.get_surface()
+    props = [explosion_props()]
+    particles = cr.ParticlePool()
+    index = [0]
+    def frame():
+        items = props[0]
+        if index[0] >= len(items):
+            props[0] = items = explosion_props()
+            index[0] = 0
+            particles.clear()
+        item = items[index[0]]
+        item.is_egg = True
+        r = item.vehicle.rect
+        particles.spawn(r.centerx, r.centery, item.vehicle.color, cr.VEHICLE_BURST_PARTICLES)
+        index[0] += 1
+        particles.update()
+        screen.fill((34, 139, 34))
+        for it in items: it.draw(screen)
+        particles.draw(screen)
+    return frame
+
+CASES = {
+    REFERENCE_CASE: case_reference,
+    "lane[grass]": lambda: case_lane("grass"),
+    "lane[road]": lambda: case_lane("road"),
+    "lane[rail]": lambda: case_lane("rail"),
+    "lane_texture[grass]": lambda: case_lane_texture("grass"),
+    "lane_texture[road]": lambda: case_lane_texture("road"),
+    "lane_texture[rail]": lambda: case_lane_texture("rail"),
+    "vehicle_draw[car]": lambda: case_vehicle_draw("car"),
+    "vehicle_draw[truck]": lambda: case_vehicle_draw("truck"),
+    "vehicle_draw[train]": lambda: case_vehicle_draw("train"),
+    "egg_draw": case_egg,
+    "egg_render": case_egg_render,
+    "chicken[1x]": lambda: case_chicken(1.0),
+    "chicken[2x]": lambda: case_chicken(2.0),
+    "frame[level0]": lambda: case_frame(0),
+    "frame[level5]": lambda: case_frame(5),
+    "frame[level10]": lambda: case_frame(10),
+    "headless_step": case_headless_step,
+    "shared_step[1]": lambda: case_shared_step(1),
+    "shared_step[256]": lambda: case_shared_step(256),
+    "pixels[84x84]": lambda: case_pixels((84, 84), False),
+    "pixels[84x84 gray]": lambda: case_pixels((84, 84), True),
+    "game_over_explosion": case_explosion,
+}
+
+# --- Runner ---
+
+def measure(make_op, seconds=0.5, repeats=5, alloc_ops=200):
+    """ Best-of-N ops/sec, then a separate traced pass for memory per op: blocks still held
+        afterwards (net, so a temporary freed within the op is not one) and the peak of
+        temporary memory within an op """
+    random.seed(BENCH_SEED)
+    op = make_op()
+    for _ in range(20): op() # warm caches the way a running game would
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number): op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / repeats: break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number): op()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    surfaces_before = cr.SURFACE_STATS["allocations"]
+    tracemalloc.start()
+    snap_before = tracemalloc.take_snapshot()
+    peak = 0
+    for _ in range(alloc_ops):
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        op()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - held)
+    snap_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snap_after.compare_to(snap_before, "filename")
+    blocks = sum(max(0, s.count_diff) for s in stats)
+    size = sum(max(0, s.size_diff) for s in stats)
+    return {
+        "ops_per_sec": 1.0 / best if best > 0 else float("inf"),
+        "us_per_op": best * 1e6,
+        "retained_blocks_per_op": blocks / alloc_ops,
+        "retained_bytes_per_op": size / alloc_ops,
+        "peak_temp_bytes": peak,
+        "surfaces_per_op": (cr.SURFACE_STATS["allocations"] - surfaces_before) / alloc_ops,
+    }
+
+def run(selected, seconds):
+    pygame.init()
+    pygame.display.set_mode((cr.SCREEN_WIDTH, cr.SCREEN_HEIGHT))
+    cr.LANE_TEXTURES.warm()
+    results = {}
+    for name, make_op in CASES.items():
+        if selected and name != REFERENCE_CASE and not any(k in name for k in selected): continue
+        results[name] = measure(make_op, seconds)
+    # Timed again at the end, best of both, so one slow spell doesn't skew every ratio
+    again = measure(CASES[REFERENCE_CASE], seconds)
+    if again["ops_per_sec"] > results[REFERENCE_CASE]["ops_per_sec"]: results[REFERENCE_CASE] = again
+    reference = results[REFERENCE_CASE]["ops_per_sec"]
+    for r in results.values(): r["relative_speed"] = r["ops_per_sec"] / reference
+    return results
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """ Prints a table against the baseline; returns the names that regressed. Cases are
+        compared by their speed relative to the reference case of the same run """
+    regressed = []
+    print(f"{'case':<24}{'ops/s':>12}{'us/op':>10}{'retained/op':>13}{'peak temp':>11}{'surf/op':>9}{'vs base':>9}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = ""
+        if base and name != REFERENCE_CASE:
+            if "relative_speed" in base: ratio = r["relative_speed"] / base["relative_speed"]
+            else: ratio = r["ops_per_sec"] / base["ops_per_sec"] # baselines from before the reference case
+            delta = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio < 1 - tolerance:
+                regressed.append(name)
+                delta += " !"
+        print(f"{name:<24}{r['ops_per_sec']:>12.0f}{r['us_per_op']:>10.1f}{r['retained_blocks_per_op']:>13.2f}"
+              f"{r['peak_temp_bytes']:>11}{r['surfaces_per_op']:>9.2f}{delta:>9}")
+    return regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark crossy_roads hot paths")
+    parser.add_argument("-k", action="append", default=[], help="only cases containing this text")
+    parser.add_argument("--seconds", type=float, default=0.5, help="timing budget per case")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="record the results as the baseline; gate only against one recorded on this machine")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--json", metavar="FILE", help="also write results to FILE")
+    args = parser.parse_args(argv)
+
+    results = run(args.k, args.seconds)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f: baseline = json.load(f)
+    regressed = compare(results, baseline, args.tolerance)
+    if args.json:
+        with open(args.json, "w") as f: json.dump(results, f, indent=2)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f: json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+    elif regressed:
+        print(f"REGRESSED: {', '.join(regressed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
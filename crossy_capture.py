@@ -0,0 +1,189 @@
+""" Gameplay capture to disk without stalling the game.
+
+FrameCapture copies a rendered frame out of the surface as raw 32-bit pixels through
+pygame.surfarray (a single memory copy, or every Nth pixel to downscale) and hands it to a
+bounded queue. A writer thread drains the queue to disk as either one raw RGB stream or a
+PNG sequence. Channel unpacking and PNG compression happen in the writer with NumPy and
+zlib, which release the GIL while they work, so the game thread is never held up.
+In the window the queue never blocks: if the disk falls behind, frames are dropped and
+counted rather than letting the frame rate sag. Headless capture blocks instead, since
+nothing is waiting on the frame, and only renders the steps it keeps. If writing fails
+(disk full, permissions), the next capture() or close() raises the writer's error.
+
+Raw output is frames.rgb plus frames.json; turn it into a video with e.g.
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i frames.rgb out.mp4
+
+    python crossy_roads.py --capture runs/me --capture-every 2           # while playing
+    python crossy_capture.py --policy crossy_ai:planner_policy --seed 3 --every 4 --out runs/ai3
+"""
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+import crossy_roads as cr
+
+CAPTURE_QUEUE_SIZE = 64 # Frames buffered between the game and the writer thread
+MAX_CAPTURE_FRAMES = 10 * 60 * cr.FPS
+FORMATS = ("raw", "png")
+PNG_COMPRESSION = 1 # zlib level: fast beats small for a writer that must keep up with 60 FPS
+WRITER_POLL_SECONDS = 0.1 # How often a blocked put() checks whether the writer has failed
+
+def png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+def encode_png(rgb):
+    """ (height, width, 3) uint8 -> PNG bytes, unfiltered truecolor """
+    height, width, _ = rgb.shape
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8) # leading 0 = no filter
+    rows[:, 1:] = rgb.reshape(height, -1)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header)
+            + png_chunk(b"IDAT", zlib.compress(rows, PNG_COMPRESSION)) + png_chunk(b"IEND", b""))
+
+class FrameCapture:
+    """ capture(surface) after each rendered frame; close() when done """
+    def __init__(self, directory, fmt="raw", every=1, scale=1, fps=cr.FPS,
+                 queue_size=CAPTURE_QUEUE_SIZE, block=False):
+        if fmt not in FORMATS: raise ValueError(f"unknown capture format {fmt!r}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.every = every # Keep one frame in every
+        self.scale = scale # Keep one pixel in scale along each axis
+        self.fps = fps
+        self.block = block
+        self.offered = 0
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0
+        self.size = None
+        self.channels = None # byte offsets of R, G, B within a pixel
+        self.error = None # set by the writer thread if writing fails; nothing drains the queue after
+        self.queue = queue.Queue(queue_size)
+        self.stream = open(os.path.join(directory, "frames.rgb"), "wb") if fmt == "raw" else None
+        self.writer = threading.Thread(target=self.write_frames, name="frame-capture", daemon=True)
+        self.writer.start()
+
+    def wants(self):
+        """ True if the next capture() will keep its frame, so callers can skip rendering """
+        return self.offered % self.every == 0
+
+    def capture(self, surface):
+        if self.error is not None: raise self.error
+        keep = self.wants()
+        self.offered += 1
+        if not keep: return
+        if surface.get_bytesize() != 4: surface = surface.convert(32, 0)
+        if self.channels is None:
+            self.channels = [shift // 8 for shift in surface.get_shifts()[:3]]
+        view = pygame.surfarray.pixels2d(surface) # (width, height) uint32 view of the pixels
+        frame = view[::self.scale, ::self.scale].copy(order="K") # row-major like the surface
+        del view # unlocks the surface
+        if self.size is None: self.size = frame.shape
+        if self.block:
+            if not self.put(frame): raise self.error
+            self.queued += 1
+            return
+        try:
+            self.queue.put_nowait(frame)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def put(self, item):
+        """ Blocking queue.put(); False if the writer fails first """
+        while self.error is None:
+            try:
+                self.queue.put(item, timeout=WRITER_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def write_frames(self):
+        try:
+            while True:
+                frame = self.queue.get()
+                if frame is None: break
+                self.write_frame(frame)
+        except Exception as e: # disk full, permissions...: re-raised by capture() and close()
+            self.error = e
+
+    def write_frame(self, frame):
+        pixels = np.ascontiguousarray(frame.T) # (height, width), no copy after copy(order="K")
+        bgra = pixels.view(np.uint8).reshape(pixels.shape + (4,))
+        rgb = np.empty(pixels.shape + (3,), dtype=np.uint8)
+        for i, channel in enumerate(self.channels): rgb[:, :, i] = bgra[:, :, channel]
+        if self.stream is not None:
+            self.stream.write(rgb) # buffers go to disk without a bytes copy
+        else:
+            with open(os.path.join(self.directory, f"frame-{self.written:06d}.png"), "wb") as f:
+                f.write(encode_png(rgb))
+        self.written += 1
+
+    def close(self):
+        """ Waits for the writer to finish and writes frames.json; returns its contents, or
+            raises what made the writer fail """
+        self.put(None)
+        self.writer.join()
+        if self.stream is not None: self.stream.close()
+        width, height = self.size or (0, 0)
+        meta = {
+            "format": "rgb24" if self.fmt == "raw" else "png",
+            "width": width,
+            "height": height,
+            "fps": self.fps / self.every,
+            "frames": self.written,
+            "dropped": self.dropped,
+        }
+        with open(os.path.join(self.directory, "frames.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if self.error is not None: raise self.error
+        return meta
+
+def capture_headless(act, seed, capture, max_frames=MAX_CAPTURE_FRAMES):
+    """ Plays one game at full simulation speed with act(state) -> action, rendering only the
+        frames capture keeps. Needs no display. Returns the final GameState """
+    surface = pygame.Surface((cr.SCREEN_WIDTH, cr.SCREEN_HEIGHT))
+    hud = cr.Hud(cr.load_font("Arial", 28, bold=True))
+    state = cr.GameState(seed, textured=True)
+    while not state.game_over and state.frame < max_frames:
+        state.step(act(state))
+        if capture.wants():
+            cr.draw_world(surface, state)
+            state.player.draw(surface, state.camera_y)
+            hud.draw(surface, state.score, 0)
+        capture.capture(surface)
+    return state
+
+def main(argv=None):
+    from crossy_runner import load_policy
+    parser = argparse.ArgumentParser(description="Record a policy's game to disk, headless")
+    parser.add_argument("--policy", default="crossy_ai:planner_policy", help="module:factory as for crossy_runner")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="raw")
+    parser.add_argument("--every", type=int, default=1, help="keep one simulated frame in N")
+    parser.add_argument("--scale", type=int, default=1, help="keep one pixel in N along each axis")
+    parser.add_argument("--max-frames", type=int, default=MAX_CAPTURE_FRAMES)
+    args = parser.parse_args(argv)
+
+    capture = FrameCapture(args.out, args.format, args.every, args.scale, block=True)
+    start = time.perf_counter()
+    state = capture_headless(load_policy(args.policy)(args.seed), args.seed, capture, args.max_frames)
+    meta = capture.close()
+    elapsed = time.perf_counter() - start
+    print(f"seed {args.seed}: score {state.score}, {state.frame} frames simulated in {elapsed:.1f}s "
+          f"({state.frame / elapsed:.0f} fps), {meta['frames']} written as {meta['width']}x{meta['height']} "
+          f"{meta['format']} at {meta['fps']:g} fps to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+""" Shared-world multi-agent mode: hundreds of chickens in one level.
+
+SharedGame runs a single world with N players: one LaneStream, one deque of lanes, and
+one set of vehicles that is updated once per tick. The players are kept in NumPy arrays.
+Every agent faces identical traffic, so comparing policies does not need N separate
+worlds, and the difference between them is not blurred by N different levels.
+
+The camera is common. It auto scrolls the way GameState's does, and the leading live
+chicken pushes it up. The difficulty level follows that push the way GameState's follows
+its score, so with one agent the world plays exactly like a GameState. A chicken whose
+bottom edge reaches the bottom of the screen dies ("scrolled"), so agents left behind by
+the leader fall off. Each agent scores 10 points per row of its furthest progress.
+
+Collision buckets live agents by the lane row their hitbox is on and tests each lane's
+vehicles against that lane's agents only, with NumPy comparisons. A tick costs one world
+update plus a few array operations over the agents.
+
+    python crossy_multi.py --agents 256 --seed 3 --policies crossy_ai:planner_policy,crossy_runner:forward_policy
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from crossy_roads import (SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, PLAYER_SIZE, FPS, SCROLL_THRESHOLD,
+                          SCROLL_DELAY_FRAMES, ACTION_NONE, ACTION_DX, ACTION_DY, DEATH_CAUSES, VEHICLE_TYPES,
+                          CAUSE_SCROLLED, HITBOX_INSET, HITBOX_SIZE, LaneStream, row_at)
+from crossy_batch import START_LANES
+
+START_Y = SCREEN_HEIGHT - GRID_SIZE - 5 # Player() starts here
+MAX_SHARED_FRAMES = 10 * 60 * FPS # 10 minutes of play
+
+class SharedGame:
+    """ N agents in one world. step(actions) takes one action per agent and returns
+        (rewards, dones); the game is over once every agent is dead """
+    def __init__(self, n, seed=None, textured=False):
+        self.n = n
+        self.textured = textured
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.lane_stream = LaneStream(self.seed, self.textured)
+        self.lanes = deque(self.lane_stream.take(row, 0) for row in range(START_LANES))
+        self.camera_y = 0
+        self.total_scroll_y = 0 # Leader driven scroll only
+        self.world_score = 0 # What GameState would score for the leader; sets the difficulty
+        self.frame = 0
+        self.scroll_accumulator = 0.0
+
+        n = self.n
+        self.x = np.full(n, SCREEN_WIDTH // 2, dtype=np.int64)
+        self.y = np.full(n, START_Y, dtype=np.int64)
+        self.facing_right = np.ones(n, dtype=bool)
+        self.alive = np.ones(n, dtype=bool)
+        self.best_row = np.zeros(n, dtype=np.int64) # Rows above the start, at the furthest
+        self.score = np.zeros(n, dtype=np.int64)
+        self.death_cause = np.full(n, -1, dtype=np.int8) # index into DEATH_CAUSES, -1 alive
+        self.death_frame = np.full(n, -1, dtype=np.int64)
+        return self
+
+    @property
+    def difficulty_level(self):
+        return int(self.world_score // 100)
+
+    @property
+    def game_over(self):
+        return not self.alive.any()
+
+    def lane_at_row(self, row):
+        index = row - self.lanes[0].row
+        if 0 <= index < len(self.lanes): return self.lanes[index]
+        return None
+
+    def kill(self, agents, cause):
+        """ Kills agents (indices) still alive; an agent keeps the first cause it died of """
+        agents = agents[self.alive[agents]]
+        self.alive[agents] = False
+        self.death_cause[agents] = cause
+        self.death_frame[agents] = self.frame
+
+    def step(self, actions=None):
+        """ Advances one frame with an action per agent (dead agents' are ignored).
+            Returns (rewards, dones) arrays """
+        alive = self.alive
+        rewards = np.zeros(self.n, dtype=np.int64)
+        if not alive.any(): return rewards, ~alive
+
+        if actions is not None:
+            actions = np.asarray(actions)
+            if actions.any():
+                actions = np.where(alive, actions, ACTION_NONE)
+                dx = ACTION_DX[actions]
+                self.x += dx
+                self.y += ACTION_DY[actions]
+                np.maximum(self.x, 0, out=self.x) # np.clip costs more per call than both
+                np.minimum(self.x, SCREEN_WIDTH - PLAYER_SIZE, out=self.x)
+                self.facing_right[dx > 0] = True
+                self.facing_right[dx < 0] = False
+                best_row = np.maximum(self.best_row, (START_Y - self.y) // GRID_SIZE)
+                rewards = (best_row - self.best_row) * 10
+                self.best_row = best_row
+                self.score = best_row * 10
+
+        difficulty_level = self.difficulty_level
+        self.frame += 1
+
+        # --- AUTO SCROLL (WITH DELAY) ---
+        if self.frame > SCROLL_DELAY_FRAMES:
+            self.scroll_accumulator += min(3.0, 0.5 + difficulty_level * 0.1)
+            whole_pixels = int(self.scroll_accumulator)
+            self.camera_y += whole_pixels
+            self.scroll_accumulator -= whole_pixels
+
+        # The leading chicken pushes the camera
+        player_top = int(self.y[alive].min()) + self.camera_y
+        if player_top < SCROLL_THRESHOLD:
+            scroll_amount = SCROLL_THRESHOLD - player_top
+            self.camera_y += scroll_amount
+            self.total_scroll_y += scroll_amount
+            self.world_score = int(self.total_scroll_y // GRID_SIZE) * 10
+
+        # Death Check
+        fell = (self.y >= SCREEN_HEIGHT - PLAYER_SIZE - self.camera_y) & alive
+        if fell.any(): self.kill(fell.nonzero()[0], CAUSE_SCROLLED)
+
+        # Lane Management
+        lanes = self.lanes
+        while lanes and lanes[0].y + self.camera_y >= SCREEN_HEIGHT:
+            lanes.popleft()
+        if lanes[-1].y + self.camera_y > -GRID_SIZE:
+            lanes.append(self.lane_stream.take(lanes[-1].row + 1, difficulty_level))
+
+        # Vehicle Updates: once for everyone
+        for lane in lanes:
+            lane.update()
+
+        self.collide()
+        return rewards, ~self.alive
+
+    def collide(self):
+        """ Tests each live agent's hitbox against its own row's vehicles only. Players hop
+            whole GRID_SIZE rows from START_Y, so a hitbox never spans two rows """
+        idx = self.alive.nonzero()[0]
+        if not idx.size: return
+        left = self.x[idx] + HITBOX_INSET
+        top = self.y[idx] + HITBOX_INSET
+        # Never negative: the death check has already killed anyone below the bottom lane
+        lane_index = row_at(top) - self.lanes[0].row
+        order = lane_index.argsort(kind="stable")
+        ends = np.bincount(lane_index, minlength=len(self.lanes)).cumsum().tolist()
+        start = 0
+        for lane, end in zip(self.lanes, ends):
+            if end > start and lane.vehicles:
+                members = order[start:end]
+                l, t = left[members], top[members]
+                for v in lane.vehicles:
+                    r = v.rect
+                    hit = (l < r.right) & (l + HITBOX_SIZE > r.left) & (t < r.bottom) & (t + HITBOX_SIZE > r.top)
+                    if hit.any(): self.kill(idx[members[hit]], VEHICLE_TYPES.index(v.type))
+            start = end
+
+    def views(self):
+        """ A GameState-like view per agent, for policies written against GameState """
+        return [AgentView(self, i) for i in range(self.n)]
+
+class AgentView:
+    """ One agent of a SharedGame seen as a GameState: the world's lanes, frame, camera and
+        difficulty, plus this agent's player, score and death """
+    def __init__(self, game, index):
+        self.game = game
+        self.index = index
+
+    @property
+    def player(self):
+        return self
+
+    @property
+    def rect(self):
+        return pygame.Rect(int(self.game.x[self.index]), int(self.game.y[self.index]), PLAYER_SIZE, PLAYER_SIZE)
+
+    @property
+    def facing_right(self):
+        return bool(self.game.facing_right[self.index])
+
+    @property
+    def lanes(self):
+        return self.game.lanes
+
+    @property
+    def frame(self):
+        return self.game.frame
+
+    @property
+    def camera_y(self):
+        return self.game.camera_y
+
+    @property
+    def seed(self):
+        return self.game.seed
+
+    @property
+    def difficulty_level(self):
+        return self.game.difficulty_level
+
+    @property
+    def game_over(self):
+        return not self.game.alive[self.index]
+
+    @property
+    def score(self):
+        return int(self.game.score[self.index])
+
+    @property
+    def death_cause(self):
+        cause = self.game.death_cause[self.index]
+        return DEATH_CAUSES[cause] if cause >= 0 else None
+
+    def lane_at_row(self, row):
+        return self.game.lane_at_row(row)
+
+def run_shared(policies, n, seed, max_frames=MAX_SHARED_FRAMES):
+    """ Plays one SharedGame with agent i driven by policies[i % len(policies)] (factory
+        specs as for crossy_runner, made with seed i). Returns (game, seconds in step()) """
+    from crossy_runner import load_policy
+    game = SharedGame(n, seed)
+    views = game.views()
+    acts = [load_policy(policies[i % len(policies)])(i) for i in range(n)]
+    actions = np.zeros(n, dtype=np.int64)
+    stepping = 0.0
+    while not game.game_over and game.frame < max_frames:
+        alive = game.alive
+        for i in np.flatnonzero(alive).tolist(): actions[i] = acts[i](views[i])
+        actions[~alive] = ACTION_NONE
+        start = time.perf_counter()
+        game.step(actions)
+        stepping += time.perf_counter() - start
+    return game, stepping
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare policies on identical traffic in one shared level")
+    parser.add_argument("--policies", default="crossy_ai:planner_policy,crossy_runner:forward_policy",
+                        help="comma separated module:factory specs, assigned to agents round robin")
+    parser.add_argument("--agents", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=MAX_SHARED_FRAMES)
+    args = parser.parse_args(argv)
+
+    policies = args.policies.split(",")
+    start = time.perf_counter()
+    game, stepping = run_shared(policies, args.agents, args.seed, args.max_frames)
+    elapsed = time.perf_counter() - start
+    print(f"seed {args.seed}: {args.agents} agents, {game.frame} frames in {elapsed:.1f}s, "
+          f"world step {stepping / max(1, game.frame) * 1e6:.0f} us/frame")
+    for p, policy in enumerate(policies):
+        members = np.arange(p, args.agents, len(policies))
+        scores = game.score[members]
+        lived = np.where(game.death_frame[members] >= 0, game.death_frame[members], game.frame)
+        causes = {}
+        for c in game.death_cause[members].tolist():
+            cause = DEATH_CAUSES[c] if c >= 0 else "alive"
+            causes[cause] = causes.get(cause, 0) + 1
+        print(f"{policy}: {members.size} agents, mean score {scores.mean():.1f}, max {scores.max()}, "
+              f"mean frames {lived.mean():.0f}, deaths {causes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+""" Grid-occupancy observation tensor for agents, maintained incrementally.
+
+GridObserver exposes a float32 array of shape (CHANNELS, OBS_ROWS, OBS_COLS): one cell
+per GRID_SIZE square, row 0 the farthest lane ahead, the last row the bottom lane.
+
+Channels:
+    CH_LANE_TYPE  0 grass, 1 road, 2 rail
+    CH_OCCUPIED   1 where a vehicle covers part of the cell
+    CH_VELOCITY   the lane's vehicle speed in px/frame (signed, 0 on grass)
+    CH_ARRIVAL    frames until the next vehicle reaches the cell (0 if occupied,
+                  capped at ARRIVAL_HORIZON, which also means none is coming)
+    CH_PLAYER     1 on the player's cell
+
+Nothing is rebuilt per step. Rows live in a ring indexed by lane row and are stored
+twice, so the rows on screen are always one contiguous slice: scrolling only moves
+the slice start, a spawned lane writes one row, and a lane's occupancy and arrival
+row are recomputed only when one of its vehicles crosses a column boundary or respawns.
+In between, arrival times count down with one vectorized subtraction per step; they
+are kept uncapped so a cell beyond the horizon starts counting once it comes within it.
+
+    python crossy_obs.py --games 20   # check update() against rebuild() on every frame
+"""
+import argparse
+import math
+import random
+
+import numpy as np
+
+from crossy_roads import (SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE, LANE_TYPES, GameState, Lane, row_at, row_y,
+                          trajectory)
+
+OBS_ROWS = int(SCREEN_HEIGHT / GRID_SIZE) + 2 # Most lanes a GameState ever holds
+OBS_COLS = SCREEN_WIDTH // GRID_SIZE
+CH_LANE_TYPE, CH_OCCUPIED, CH_VELOCITY, CH_ARRIVAL, CH_PLAYER = range(5)
+CHANNELS = 5
+ARRIVAL_HORIZON = 255.0
+LANE_CODES = {'grass': 0.0, 'road': 1.0, 'rail': 2.0}
+
+class GridObserver:
+    """ Keeps observation in sync with a GameState; call update() after every step() """
+    def __init__(self, state):
+        self.state = state
+        # Every row is written at slot and slot + OBS_ROWS so any window is contiguous
+        self.buffer = np.zeros((CHANNELS, 2 * OBS_ROWS, OBS_COLS), dtype=np.float32)
+        self.eta = np.empty((2 * OBS_ROWS, OBS_COLS), dtype=np.float32) # CH_ARRIVAL before the cap
+        self.col_left = np.arange(OBS_COLS) * GRID_SIZE # ints, like Rect positions
+        self.reset()
+
+    def reset(self):
+        """ Full rebuild; needed after state.reset() """
+        self.buffer[:] = 0.0
+        self.buffer[CH_ARRIVAL] = ARRIVAL_HORIZON
+        self.eta[:] = np.inf
+        self.slot_row = [None] * OBS_ROWS
+        self.lane_keys = {} # row -> vehicle column spans last written
+        self.player_cell = None
+        self.frame = self.state.frame
+        self.bottom_row = self.state.lanes[0].row
+        for lane in self.state.lanes: self.write_lane(lane)
+        self.update()
+
+    @staticmethod
+    def slot(row):
+        return (-row) % OBS_ROWS
+
+    def set_row(self, row, channel, values):
+        s = self.slot(row)
+        self.buffer[channel, s] = values
+        self.buffer[channel, s + OBS_ROWS] = values
+
+    def clear_row(self, row):
+        """ Blanks a culled row's slot so it reads as empty until a new lane claims it """
+        s = self.slot(row)
+        self.slot_row[s] = None
+        for channel in range(CHANNELS): self.set_row(row, channel, 0.0)
+        self.set_arrival(row, np.inf)
+        self.lane_keys.pop(row, None)
+
+    def write_lane(self, lane):
+        """ Static channels for a freshly spawned lane, then its vehicles """
+        s = self.slot(lane.row)
+        self.slot_row[s] = lane.row
+        self.set_row(lane.row, CH_PLAYER, 0.0)
+        self.set_row(lane.row, CH_LANE_TYPE, LANE_CODES[lane.lane_type])
+        # Not lane.lane_speed: rail lanes keep an unused road speed there
+        self.set_row(lane.row, CH_VELOCITY, lane.vehicles[0].speed if lane.vehicles else 0.0)
+        self.lane_keys.pop(lane.row, None)
+        self.write_vehicles(lane)
+
+    def set_arrival(self, row, eta):
+        s = self.slot(row)
+        self.eta[s] = eta
+        self.eta[s + OBS_ROWS] = eta
+        self.set_row(row, CH_ARRIVAL, np.minimum(eta, ARRIVAL_HORIZON))
+
+    def write_vehicles(self, lane):
+        occupied = np.zeros(OBS_COLS, dtype=np.float32)
+        arrival = np.full(OBS_COLS, np.inf, dtype=np.float32)
+        left = self.col_left
+        right = left + GRID_SIZE
+        for v in lane.vehicles:
+            x, w = v.rect.x, v.rect.width
+            covers = (x < right) & (x + w > left)
+            occupied[covers] = 1.0
+            # Moves until the vehicle first overlaps each column ahead of it, stepping the
+            # way Rect rounds it, far enough to reach the last column
+            step = max(1, math.ceil(abs(v.speed) - 0.5)) # the slower of its two step sizes
+            if v.speed > 0:
+                ahead = left >= x + w
+                path = trajectory(x, v.speed, int(max(0, left[-1] - x - w) // step + 2))
+                eta = np.searchsorted(path + w, left, side="right") + 1.0
+            else:
+                ahead = right <= x
+                path = trajectory(x, v.speed, int(max(0, x - right[0]) // step + 2))
+                eta = np.searchsorted(-path, -right, side="right") + 1.0
+            eta = np.where(covers, 0.0, np.where(ahead & (eta <= len(path)), eta, np.inf))
+            np.minimum(arrival, eta, out=arrival)
+        self.set_row(lane.row, CH_OCCUPIED, occupied)
+        self.set_arrival(lane.row, arrival)
+
+    def update(self):
+        state = self.state
+        if state.frame < self.frame: return self.reset()
+        elapsed = state.frame - self.frame
+        self.frame = state.frame
+        lanes = state.lanes
+
+        # Arrivals count down as vehicles keep their constant speed
+        if elapsed:
+            eta = self.eta
+            np.subtract(eta, elapsed, out=eta)
+            np.maximum(eta, 0.0, out=eta)
+            np.minimum(eta, ARRIVAL_HORIZON, out=self.buffer[CH_ARRIVAL])
+
+        # Culled lanes leave blank slots, newly spawned ones write theirs
+        while self.bottom_row < lanes[0].row:
+            self.clear_row(self.bottom_row)
+            self.bottom_row += 1
+        for lane in reversed(lanes):
+            if self.slot_row[self.slot(lane.row)] == lane.row: break
+            self.write_lane(lane)
+
+        # Rewrite a lane only when a vehicle's column span changed
+        for lane in lanes:
+            if not lane.vehicles:
+                if self.lane_keys.get(lane.row): # vehicles removed (game over)
+                    self.lane_keys[lane.row] = ()
+                    self.write_vehicles(lane)
+                continue
+            key = tuple((v.rect.x // GRID_SIZE, (v.rect.right - 1) // GRID_SIZE) for v in lane.vehicles)
+            if self.lane_keys.get(lane.row) != key:
+                self.lane_keys[lane.row] = key
+                self.write_vehicles(lane)
+
+        # Player cell
+        rect = state.player.rect
+        cell = (row_at(rect.centery), min(OBS_COLS - 1, max(0, rect.centerx // GRID_SIZE)))
+        if cell != self.player_cell:
+            if self.player_cell is not None: self.set_cell(self.player_cell, 0.0)
+            self.player_cell = cell
+            self.set_cell(cell, 1.0)
+
+        top = lanes[0].row + OBS_ROWS - 1
+        start = self.slot(top)
+        self.observation = self.buffer[:, start:start + OBS_ROWS]
+        self.top_row = top
+        return self.observation
+
+    def set_cell(self, cell, value):
+        row, col = cell
+        s = self.slot(row)
+        self.buffer[CH_PLAYER, s, col] = value
+        self.buffer[CH_PLAYER, s + OBS_ROWS, col] = value
+
+    def rebuild(self):
+        """ A from-scratch encoding of the same state, for checking the incremental one """
+        fresh = GridObserver.__new__(GridObserver)
+        fresh.state = self.state
+        fresh.buffer = np.zeros_like(self.buffer)
+        fresh.eta = np.empty_like(self.eta)
+        fresh.col_left = self.col_left
+        fresh.reset()
+        return fresh.observation
+
+def check(state, frames, act=lambda state: 0):
+    """ Steps state, comparing update() with rebuild() every frame. Returns mismatched cells """
+    observer = GridObserver(state)
+    mismatched = int((observer.update() != observer.rebuild()).sum())
+    for _ in range(frames):
+        if state.game_over: break
+        state.step(act(state))
+        mismatched += int((observer.update() != observer.rebuild()).sum())
+    return mismatched
+
+def main(argv=None):
+    from crossy_runner import forward_policy
+    parser = argparse.ArgumentParser(description="Check the incremental observation against a rebuild")
+    parser.add_argument("--games", type=int, default=20, help="forward_policy games to check frame by frame")
+    parser.add_argument("--max-level", type=int, default=60, help="check every lane type at levels 1..N")
+    args = parser.parse_args(argv)
+
+    # Every lane type at every level, a few speeds each: some levels' speeds land on a half
+    lane_mismatches = 0
+    for level in range(1, args.max_level + 1):
+        for lane_type in LANE_TYPES:
+            for lane_seed in range(4):
+                state = GameState(level)
+                row = state.lanes[3].row
+                state.lanes[3] = Lane(row_y(row), lane_type, level, random.Random(level * 100 + lane_seed), False, row)
+                lane_mismatches += check(state, 20)
+    print(f"lane types at levels 1-{args.max_level}: {lane_mismatches} mismatched cells")
+
+    game_mismatches = 0
+    for seed in range(args.games):
+        game_mismatches += check(GameState(seed), 3000, forward_policy(seed))
+    print(f"{args.games} forward_policy games: {game_mismatches} mismatched cells")
+    if lane_mismatches or game_mismatches: raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
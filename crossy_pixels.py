@@ -0,0 +1,209 @@
+""" Small offscreen pixel observations for agents that learn from images.
+
+PixelRenderer draws a GameState at a reduced resolution such as 84x84 or 160x120, in
+color or grayscale, without a window, a display mode or display.flip(). It uses the
+game's own looks - each lane's own texture variant, Vehicle sprites and draw_chicken() -
+scaled once to the target size and cached, so a frame is a fill and a few dozen small blits. The target Surface is made
+with pygame.image.frombuffer over a NumPy array, so pygame draws straight into memory
+that NumPy reads in place: a color observation is a view of that array, with no copy.
+
+FrameStack keeps the last few observations of a batch of games in one preallocated
+ring. Every frame is written at slot and slot + stack, so the stack of any step is one
+contiguous slice and is returned as a view (batch, stack, height, width[, 3]). Color
+frames are drawn by pygame straight into the ring's slots, which keep the unused fourth
+byte of each pixel: dropping it in a copy would cost more than drawing the frame.
+
+    python crossy_pixels.py --size 84x84 --gray --batch 32 --stack 4 --frames 2000
+    python crossy_pixels.py --size 160x120 --save obs.png
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pygame
+
+import crossy_roads as cr
+
+LUMA_WEIGHTS = (77, 150, 29) # ITU-R BT.601 in 1/256ths
+LUMA_MATRIX = np.array(LUMA_WEIGHTS + (0,), dtype=np.float32) / 256 # RGBX -> luma, truncated like >> 8
+CHICKEN_SPRITE_HEIGHT = cr.PLAYER_SIZE + 3 # draw_chicken()'s shadow hangs 3px below the rect
+BACKGROUND = (34, 139, 34) # draw_world() fills with grass
+BACKGROUND_PIXEL = int.from_bytes(bytes(BACKGROUND + (0,)), "little") # as one RGBX uint32
+
+def parse_size(text):
+    """ "84x84" -> (84, 84) """
+    width, _, height = text.partition("x")
+    return int(width), int(height)
+
+class PixelRenderer:
+    """ render(state) -> (height, width, 3) uint8 view, or (height, width) if grayscale.
+        The result is overwritten by the next render() """
+    def __init__(self, width=84, height=84, grayscale=False):
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.shape = (height, width) if grayscale else (height, width, 3)
+        self.sx = width / cr.SCREEN_WIDTH
+        self.sy = height / cr.SCREEN_HEIGHT
+
+        # RGBX byte order: the array's last axis is R, G, B, unused
+        self.frame = np.zeros((height, width, 4), dtype=np.uint8)
+        self.surface = self.canvas(self.frame)
+        self.rgb = self.frame[:, :, :3]
+        self.frame_float = np.zeros((height * width, 4), dtype=np.float32)
+        self.luma = np.zeros(height * width, dtype=np.float32)
+        self.gray = np.zeros((height, width), dtype=np.uint8)
+
+        cr.LANE_TEXTURES.warm()
+        lane_height = math.ceil(cr.GRID_SIZE * self.sy) # never short: see draw()
+        self.lane_textures = {lane_type: [self.scaled(t, (width, lane_height)) for t in variants]
+                              for lane_type, variants in cr.LANE_TEXTURES.textures.items()}
+        self.vehicle_sprites = cr.SurfaceCache(cr.VEHICLE_SPRITE_CACHE_SIZE)
+        chicken_size = self.size_of((cr.PLAYER_SIZE, CHICKEN_SPRITE_HEIGHT))
+        self.chickens = {facing: self.scaled(self.chicken_sprite(facing), chicken_size, alpha=True) for facing in (False, True)}
+
+    def canvas(self, frame):
+        """ A Surface drawing into frame, a C-contiguous (height, width, 4) uint8 array """
+        return pygame.image.frombuffer(frame, (self.width, self.height), "RGBX")
+
+    def size_of(self, size):
+        return max(1, round(size[0] * self.sx)), max(1, round(size[1] * self.sy))
+
+    def scaled(self, surface, size, alpha=False):
+        """ surface resized and copied into the target's pixel layout, so blits need no conversion """
+        small = pygame.transform.smoothscale(surface, size)
+        if not alpha:
+            out = pygame.Surface(size, 0, self.surface)
+            out.blit(small, (0, 0))
+            return out
+        out = pygame.Surface(size, pygame.SRCALPHA, 32, (0xFF, 0xFF00, 0xFF0000, 0xFF000000))
+        out.blit(small, (0, 0), special_flags=pygame.BLEND_RGBA_MAX) # a plain blit would blend the alpha away
+        return out
+
+    @staticmethod
+    def chicken_sprite(facing_right):
+        sprite = pygame.Surface((cr.PLAYER_SIZE, CHICKEN_SPRITE_HEIGHT), pygame.SRCALPHA)
+        cr.draw_chicken(sprite, pygame.Rect(0, 0, cr.PLAYER_SIZE, cr.PLAYER_SIZE), facing_right)
+        return sprite
+
+    def vehicle_sprite(self, v):
+        def build():
+            sprite = cr.VEHICLE_SPRITES.get(v.sprite_key, v.render_sprite)
+            return self.scaled(sprite, self.size_of(sprite.get_size()), alpha=True)
+        return self.vehicle_sprites.get(v.sprite_key, build)
+
+    def draw(self, state, frame=None, surface=None):
+        """ Paints state into a canvas (self.frame by default) the way draw_world() and
+            Player.draw() paint the screen """
+        if frame is None: frame, surface = self.frame, self.surface
+        sx, sy = self.sx, self.sy
+        blit, floor = surface.blit, math.floor
+        camera_y = state.camera_y
+        frame.view(np.uint32).fill(BACKGROUND_PIXEL) # Surface.fill() costs 40x more at this size
+        for lane in state.lanes:
+            # Rounding both edges the same way keeps bottom - top <= lane_height
+            top = floor((lane.y + camera_y) * sy + 0.5)
+            bottom = floor((lane.y + cr.GRID_SIZE + camera_y) * sy + 0.5)
+            if bottom <= 0 or top >= self.height: continue
+            variants = self.lane_textures[lane.lane_type]
+            index = lane.texture_index
+            if index is None: index = lane.row % len(variants) # an untextured (headless) lane
+            blit(variants[index], (0, top), (0, 0, self.width, bottom - top))
+            for v in lane.vehicles:
+                r = v.rect
+                blit(self.vehicle_sprite(v), (floor(r.x * sx + 0.5), floor((r.y + camera_y - cr.SPRITE_TOP_MARGIN) * sy + 0.5)))
+        player = state.player
+        blit(self.chickens[player.facing_right], (floor(player.rect.x * sx + 0.5), floor((player.rect.y + camera_y) * sy + 0.5)))
+
+    def render(self, state, out=None):
+        """ The observation of state, written into out if given """
+        self.draw(state)
+        if not self.grayscale:
+            if out is None: return self.rgb
+            out[...] = self.rgb
+            return out
+        # One float matrix product beats integer math on the strided R, G and B planes
+        self.frame_float[...] = self.frame.reshape(-1, 4)
+        np.dot(self.frame_float, LUMA_MATRIX, out=self.luma)
+        out = self.gray if out is None else out
+        out[...] = self.luma.reshape(self.shape)
+        return out
+
+class FrameStack:
+    """ The last `stack` observations of each of `batch` games. step() renders one frame per
+        game and returns a (batch, stack, *renderer.shape) view, oldest frame first """
+    def __init__(self, renderer, batch, stack=4):
+        self.renderer = renderer
+        self.batch = batch
+        self.stack = stack
+        # Color slots are RGBX canvases that pygame draws into; observations view their RGB
+        frame_shape = renderer.shape if renderer.grayscale else (renderer.height, renderer.width, 4)
+        self.buffer = np.zeros((batch, 2 * stack) + frame_shape, dtype=np.uint8)
+        self.canvases = None if renderer.grayscale else [
+            [renderer.canvas(self.buffer[i, slot]) for slot in range(stack)] for i in range(batch)]
+        self.slot = stack - 1 # slot of the newest frame
+
+    def observation(self):
+        start = self.slot + 1
+        window = self.buffer[:, start:start + self.stack]
+        return window if self.canvases is None else window[..., :3]
+
+    def reset(self, states):
+        """ Fills every game's stack with its current frame """
+        return self.step(states, restarted=range(self.batch))
+
+    def step(self, states, restarted=()):
+        """ Pushes a frame per game; games listed in restarted get a stack of only that frame """
+        stack, buffer = self.stack, self.buffer
+        self.slot = slot = (self.slot + 1) % stack
+        for i, state in enumerate(states):
+            if self.canvases is None: self.renderer.render(state, out=buffer[i, slot])
+            else: self.renderer.draw(state, buffer[i, slot], self.canvases[i][slot])
+            buffer[i, slot + stack] = buffer[i, slot]
+        for i in restarted:
+            buffer[i] = buffer[i, slot]
+        return self.observation()
+
+def main(argv=None):
+    from crossy_runner import forward_policy
+    parser = argparse.ArgumentParser(description="Benchmark (or save) downsampled pixel observations")
+    parser.add_argument("--size", type=parse_size, default=(84, 84), help="WIDTHxHEIGHT")
+    parser.add_argument("--gray", action="store_true")
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--stack", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=1000, help="steps of the whole batch")
+    parser.add_argument("--save", metavar="PNG", help="write one observation of game 0 and exit")
+    args = parser.parse_args(argv)
+
+    renderer = PixelRenderer(*args.size, grayscale=args.gray)
+    states = [cr.GameState(seed) for seed in range(args.batch)]
+    policies = [forward_policy(seed) for seed in range(args.batch)]
+    if args.save:
+        from crossy_capture import encode_png
+        for _ in range(200): states[0].step(policies[0](states[0]))
+        obs = renderer.render(states[0])
+        rgb = np.repeat(obs[:, :, None], 3, axis=2) if args.gray else np.ascontiguousarray(obs)
+        with open(args.save, "wb") as f: f.write(encode_png(rgb))
+        print(f"saved a {args.size[0]}x{args.size[1]} observation to {args.save}")
+        return
+
+    frames = FrameStack(renderer, args.batch, args.stack)
+    frames.reset(states)
+    rendering = 0.0
+    for _ in range(args.frames):
+        restarted = []
+        for i, state in enumerate(states):
+            if state.game_over:
+                state.reset(state.seed + args.batch)
+                restarted.append(i)
+            state.step(policies[i](state))
+        start = time.perf_counter()
+        obs = frames.step(states, restarted)
+        rendering += time.perf_counter() - start
+    count = args.frames * args.batch
+    print(f"{count} observations of shape {obs.shape[2:]} in {rendering:.2f}s: {count / rendering:.0f} obs/s "
+          f"(stacks of {args.stack}, batch {args.batch})")
+
+if __name__ == "__main__":
+    main()
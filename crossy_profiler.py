@@ -0,0 +1,113 @@
+""" Per-phase frame-time profiler with an on-screen overlay and trace export.
+
+The game calls lap(phase) right after each phase of a frame; the time since the
+previous lap is charged to that phase, and a phase may lap several times per frame.
+A rolling window of recent frames gives p50/p95/p99 per phase. When profiling is off
+the game holds None instead of a profiler, so each hook is a single `is not None` check.
+
+Exports: CSV and JSON summaries, and Chrome trace format (open in chrome://tracing
+or https://ui.perfetto.dev) for the frames still in the window.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+PROFILE_WINDOW = 600 # Frames kept for percentiles and traces (10s at 60 FPS)
+OVERLAY_REFRESH = 30 # Frames between overlay re-renders
+
+def percentile(sorted_values, q):
+    if not sorted_values: return 0.0
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+class FrameProfiler:
+    """ Rolling per-phase timings. Call begin_frame(), lap(phase) after each phase, end_frame() """
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.samples = {}  # phase -> deque of ms
+        self.spans = deque(maxlen=window * 16) # (phase, start_s, duration_s) for traces
+        self.current = {} # phase -> seconds so far this frame
+        self.frame_start = self.last = time.perf_counter()
+        self.frames = 0
+        self.overlay = None
+        self.overlay_frame = -OVERLAY_REFRESH
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.current.clear()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        duration = now - self.last
+        self.current[phase] = self.current.get(phase, 0.0) + duration
+        self.spans.append((phase, self.last, duration))
+        self.last = now
+
+    def end_frame(self):
+        self.lap("other")
+        self.current["frame"] = self.last - self.frame_start
+        for phase, seconds in self.current.items():
+            samples = self.samples.get(phase)
+            if samples is None: samples = self.samples[phase] = deque(maxlen=self.window)
+            samples.append(seconds * 1000.0)
+        self.frames += 1
+
+    def stats(self):
+        """ {phase: {"p50", "p95", "p99", "mean", "max"}} in milliseconds """
+        out = {}
+        for phase, samples in self.samples.items():
+            values = sorted(samples)
+            out[phase] = {
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "mean": sum(values) / len(values) if values else 0.0,
+                "max": values[-1] if values else 0.0,
+            }
+        return out
+
+    # --- Export ---
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["phase", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "max_ms"])
+            for phase, s in self.stats().items():
+                writer.writerow([phase] + [f"{s[k]:.4f}" for k in ("p50", "p95", "p99", "mean", "max")])
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"frames": self.frames, "window": self.window, "phases": self.stats()}, f, indent=2)
+
+    def export_chrome_trace(self, path):
+        events = [{"name": phase, "ph": "X", "pid": 0, "tid": 0,
+                   "ts": round(start * 1e6, 1), "dur": round(duration * 1e6, 1)}
+                  for phase, start, duration in self.spans]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, path):
+        """ Picks the format from the extension: .csv, .trace.json (Chrome) or .json """
+        if path.endswith(".csv"): self.export_csv(path)
+        elif path.endswith(".trace.json"): self.export_chrome_trace(path)
+        else: self.export_json(path)
+
+    # --- Overlay ---
+
+    def draw_overlay(self, surface, font, pos=(10, 50)):
+        """ Blits a p50/p95/p99 table, re-rendered every OVERLAY_REFRESH frames """
+        if self.overlay is None or self.frames - self.overlay_frame >= OVERLAY_REFRESH:
+            self.overlay_frame = self.frames
+            lines = [f"{'phase':<12}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for phase, s in self.stats().items():
+                lines.append(f"{phase:<12}{s['p50']:7.2f}{s['p95']:7.2f}{s['p99']:7.2f}")
+            line_h = font.get_linesize()
+            width = max(font.size(line)[0] for line in lines) + 16
+            self.overlay = pygame.Surface((width, line_h * len(lines) + 12), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 170))
+            for i, line in enumerate(lines):
+                self.overlay.blit(font.render(line, True, (0, 255, 0)), (8, 6 + i * line_h))
+        surface.blit(self.overlay, pos)
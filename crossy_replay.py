@@ -0,0 +1,141 @@
+""" Compact replay recording and fast playback.
+
+A game is fully defined by its seed plus the action pressed on every frame, because
+GameState steps on a fixed timestep with its own seeded RNG. Replays store exactly
+that: a small header and the action stream run-length encoded as varints
+((run_length << 3) | action), so a minute of mostly idle play takes a few hundred bytes.
+
+    python crossy_replay.py verify runs/*.crr   # headless, as fast as the CPU allows
+    python crossy_replay.py watch runs/game-3.crr   # windowed, at normal speed
+"""
+import argparse
+import struct
+import sys
+
+from crossy_roads import GameState, ACTION_NONE
+
+MAGIC = b"CRRP"
+VERSION = 2 # 2: lanes drawn from per-row RNGs (LaneStream), so version 1 games replay differently
+HEADER = struct.Struct("<4sBqII") # magic, version, seed, frames, final score
+ACTION_BITS = 3
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varints(data, pos=0):
+    value = shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            yield value
+            value = shift = 0
+
+class Recorder:
+    """ Collects one action per frame as run-length runs """
+    def __init__(self, seed):
+        self.seed = seed
+        self.runs = [] # [action, count]
+        self.frames = 0
+        self.score = 0
+
+    def record(self, action):
+        if self.runs and self.runs[-1][0] == action: self.runs[-1][1] += 1
+        else: self.runs.append([action, 1])
+        self.frames += 1
+
+    def finish(self, score):
+        self.score = score
+        return self
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.frames, self.score))
+        for action, count in self.runs:
+            encode_varint((count << ACTION_BITS) | action, out)
+        return bytes(out)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+class Replay:
+    """ A decoded recording: seed, expected frames/score and the action runs """
+    def __init__(self, seed, frames, score, runs):
+        self.seed = seed
+        self.frames = frames
+        self.score = score
+        self.runs = runs
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, frames, score = HEADER.unpack_from(data)
+        if magic != MAGIC: raise ValueError("not a replay file")
+        if version != VERSION: raise ValueError(f"unsupported replay version {version}")
+        mask = (1 << ACTION_BITS) - 1
+        runs = [(v & mask, v >> ACTION_BITS) for v in decode_varints(data, HEADER.size)]
+        return cls(seed, frames, score, runs)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def actions(self):
+        for action, count in self.runs:
+            for _ in range(count):
+                yield action
+
+    def controller(self):
+        """ A game_loop controller that presses the recorded keys, then nothing """
+        actions = self.actions()
+        return lambda state: next(actions, ACTION_NONE)
+
+    def play_headless(self):
+        """ Re-simulates the whole game with no window and returns the final GameState """
+        state = GameState(self.seed)
+        step = state.step
+        for action, count in self.runs:
+            for _ in range(count):
+                step(action)
+        return state
+
+    def verify(self):
+        """ True if re-simulation reproduces the recorded frame count and score """
+        state = self.play_headless()
+        return state.frame == self.frames and state.score == self.score
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify or watch recorded games")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="re-simulate headless and check scores")
+    verify.add_argument("paths", nargs="+")
+    watch = sub.add_parser("watch", help="play a recording back in the game window")
+    watch.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        failed = 0
+        for path in args.paths:
+            replay = Replay.load(path)
+            state = replay.play_headless()
+            ok = state.frame == replay.frames and state.score == replay.score
+            failed += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {path}: seed={replay.seed} frames={state.frame}/{replay.frames} "
+                  f"score={state.score}/{replay.score}")
+        sys.exit(1 if failed else 0)
+
+    import pygame
+    from crossy_roads import game_loop
+    replay = Replay.load(args.path)
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_caption(f"Crossy Road - Replay (seed {replay.seed})")
+    game_loop(0, replay.seed, controller=replay.controller())
+
+if __name__ == "__main__":
+    main()
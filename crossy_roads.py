@@ -1,6 +1,19 @@
+import argparse
+import atexit
+import math
+import numpy as np
+import os
 import pygame
 import random
 import sys
+import time
+from collections import OrderedDict, deque
+
+from crossy_profiler import FrameProfiler
+
+# Importing this module initializes nothing: GameState only needs pygame.Rect, so headless
+# users (crossy_runner, crossy_batch, crossy_server) never start SDL video or audio. The
+# window, fonts and textures are created by the first game_loop() and kept for the rest.
 
 # --- Constants ---
 SCREEN_WIDTH = 800
@@ -17,7 +30,30 @@ COLOR_SPECKLE = (139, 100, 80) # Egg Spots
 
 FPS = 60
 SCROLL_THRESHOLD = 250 
+SCROLL_DELAY_FRAMES = 2 * FPS # 2 second breather before the chase starts
 EXPLOSION_SEQUENCE_DURATION = 150 # Frames
+START_GRASS_ROWS = 4 # Safe grass under the chicken at the start
+LANE_TYPES = ('grass', 'road', 'rail')
+LANE_TYPE_INDEX = {t: i for i, t in enumerate(LANE_TYPES)}
+LANE_LOOKAHEAD = 4 # Lanes prepared ahead of the top of the screen
+
+# Render caches
+VEHICLE_SPRITE_CACHE_SIZE = 128
+SPRITE_TOP_MARGIN = 5     # Roofs and wheels poke above the vehicle rect
+SPRITE_BOTTOM_MARGIN = 6  # Wheels and shadow hang below it
+SPRITE_RIGHT_MARGIN = 8   # Trailer wheels can overhang the back of a left-facing truck
+LANE_TEXTURE_VARIANTS = 8 # Pre-generated textures kept per lane type
+ALPHA_SHAPE_CACHE_SIZE = 64
+EGG_SPRITE_CACHE_SIZE = 64
+
+TEXT_CACHE_SIZE = 128
+BUBBLE_TAIL_HEIGHT = 22 # Tail plus its 2px outline
+HUD_HEIGHT = 40
+
+# Particles
+PARTICLE_CAPACITY = 512
+PLAYER_BURST_PARTICLES = 20
+VEHICLE_BURST_PARTICLES = 15
 
 CHICKEN_JOKES = [
     "Why did the chicken cross the road?\nTo get to the other side!",
@@ -34,13 +70,90 @@ CHICKEN_JOKES = [
     "What happens when a chicken eats gunpowder?\nShe lays hand-gren-eggs!"
 ]
 
+# --- Render Caches ---
+
+class SurfaceCache:
+    """ Bounded LRU of prebuilt Surfaces. get() builds on a miss and evicts the least recently used """
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        surf = self.items.get(key)
+        if surf is None:
+            self.misses += 1
+            surf = self.items[key] = build()
+            if len(self.items) > self.max_items: self.items.popitem(last=False)
+        else:
+            self.hits += 1
+            self.items.move_to_end(key)
+        return surf
+
+    def clear(self):
+        self.items.clear()
+
+# Every Surface this module's drawing code creates - new ones, font.render(), copy()
+# and convert() - is passed through counted(), so steady-state frames can be checked
+# for zero allocations. The F3 profiler overlay (crossy_profiler.py) is not counted.
+SURFACE_STATS = {"allocations": 0}
+
+def counted(surf):
+    SURFACE_STATS["allocations"] += 1
+    return surf
+
+def new_surface(size, flags=0):
+    return counted(pygame.Surface(size, flags))
+
+def prepare_surface(surf, alpha=False):
+    """ Converts to the display pixel format for fast blits, once a display exists """
+    if pygame.display.get_surface() is None: return surf
+    return counted(surf.convert_alpha() if alpha else surf.convert())
+
+VEHICLE_SPRITES = SurfaceCache(VEHICLE_SPRITE_CACHE_SIZE)
+ALPHA_SHAPES = SurfaceCache(ALPHA_SHAPE_CACHE_SIZE)
+EGG_SPRITES = SurfaceCache(EGG_SPRITE_CACHE_SIZE)
+TEXT_SURFACES = SurfaceCache(TEXT_CACHE_SIZE)
+
+FONTS = {} # (name, size, bold) -> Font
+
+def load_font(name, size, bold=False):
+    """ SysFont scans the system font directories, so each font is looked up once per process """
+    if not pygame.font.get_init():
+        FONTS.clear() # Fonts die with pygame.font.quit()
+        pygame.font.init()
+    font = FONTS.get((name, size, bold))
+    if font is None: font = FONTS[name, size, bold] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
 # --- Drawing Helpers ---
 
+def make_alpha_rect(size, color):
+    shape_surf = new_surface(size, pygame.SRCALPHA)
+    shape_surf.fill(color)
+    return shape_surf
+
 def draw_rect_alpha(surface, color, rect):
-    shape_surf = pygame.Surface(pygame.Rect(rect).size, pygame.SRCALPHA)
-    pygame.draw.rect(shape_surf, color, shape_surf.get_rect())
+    """ Blits a translucent rectangle; shapes are cached by size and RGBA """
+    rect = pygame.Rect(rect)
+    key = (rect.size, tuple(color))
+    shape_surf = ALPHA_SHAPES.get(key, lambda: make_alpha_rect(rect.size, color))
     surface.blit(shape_surf, rect)
 
+class DangerOverlay:
+    """ The red warning strip at the bottom of the screen, allocated once and re-tinted per frame """
+    def __init__(self, height=100):
+        self.surface = new_surface((SCREEN_WIDTH, height))
+        self.surface.fill((255, 0, 0))
+        self.alpha = None
+
+    def draw(self, surface, alpha):
+        if alpha != self.alpha:
+            self.surface.set_alpha(alpha)
+            self.alpha = alpha
+        surface.blit(self.surface, (0, SCREEN_HEIGHT - self.surface.get_height()))
+
 def draw_chicken(surface, rect, facing_right, scale=1.0):
     """ Can now scale the chicken for the narrator view """
     x, y = rect.x, rect.y
@@ -69,38 +182,45 @@ def draw_chicken(surface, rect, facing_right, scale=1.0):
         pygame.draw.rect(surface, (0, 0, 0), (x + (4*scale), y + (10*scale), 4*scale, 4*scale))        
         pygame.draw.rect(surface, (220, 220, 220), (x + w - (22*scale), y + (20*scale), 16*scale, 8*scale)) 
 
-def draw_realistic_egg(surface, x, y):
-    """ Draws a high-detail egg """
+def render_egg(seed):
+    """ Draws a high-detail egg into its own surface. Speckles come from a private RNG seeded by the caller """
     w, h = 40, 50
+    rng = random.Random(seed)
     
     # Create a small surface for the egg to handle per-pixel alpha easily
-    egg_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    egg_surf = new_surface((w, h), pygame.SRCALPHA)
     
     # 1. Base Shape (Cream)
     pygame.draw.ellipse(egg_surf, COLOR_CREAM, (0, 0, w, h))
     
     # 2. Shading (Bottom Right)
     # Draw a black ellipse with low alpha
-    shadow_surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    shadow_surf = new_surface((w, h), pygame.SRCALPHA)
     pygame.draw.ellipse(shadow_surf, (0, 0, 0, 40), (2, 5, w-4, h-5))
     egg_surf.blit(shadow_surf, (0,0), special_flags=pygame.BLEND_RGBA_MIN)
 
     # 3. Highlight (Top Left)
     pygame.draw.ellipse(egg_surf, (255, 255, 255, 100), (5, 5, 15, 20))
     
-    # 4. Speckles (Procedural based on location so they stick)
-    # Use x,y as seed so speckles don't shimmer
-    random.seed(int(x * y)) 
+    # 4. Speckles (same seed, same speckles, so they don't shimmer)
     for _ in range(8):
-        sx = random.randint(5, w-5)
-        sy = random.randint(5, h-5)
+        sx = rng.randint(5, w-5)
+        sy = rng.randint(5, h-5)
         pygame.draw.circle(egg_surf, COLOR_SPECKLE, (sx, sy), 1)
-    random.seed() # Reset seed
     
-    surface.blit(egg_surf, (x, y))
+    return prepare_surface(egg_surf, alpha=True)
 
-def draw_speech_bubble(surface, text, x, y, font):
-    """ Draws a speech bubble with multi-line text """
+def draw_realistic_egg(surface, x, y, seed=None):
+    """ Draws a high-detail egg. Speckles stick to the position unless a seed is given """
+    if seed is None: seed = int(x * y)
+    surface.blit(EGG_SPRITES.get(seed, lambda: render_egg(seed)), (x, y))
+
+def render_text(font, text, color):
+    """ font.render through a cache keyed by font, string and color """
+    return TEXT_SURFACES.get((font, text, tuple(color)), lambda: counted(font.render(text, True, color)))
+
+def render_speech_bubble(text, font):
+    """ Paints a speech bubble with multi-line text. The tail hangs below the box """
     lines = text.split('\n')
     
     # Calculate box size
@@ -114,88 +234,158 @@ def draw_speech_bubble(surface, text, x, y, font):
     padding = 20
     box_w = max_w + padding * 2
     box_h = total_h + padding * 2
+    bubble = new_surface((box_w, box_h + BUBBLE_TAIL_HEIGHT), pygame.SRCALPHA)
     
     # Draw Bubble Box (White with black outline)
-    bubble_rect = pygame.Rect(x, y - box_h, box_w, box_h)
-    pygame.draw.rect(surface, (255, 255, 255), bubble_rect, border_radius=10)
-    pygame.draw.rect(surface, (0, 0, 0), bubble_rect, 2, border_radius=10)
+    bubble_rect = pygame.Rect(0, 0, box_w, box_h)
+    pygame.draw.rect(bubble, (255, 255, 255), bubble_rect, border_radius=10)
+    pygame.draw.rect(bubble, (0, 0, 0), bubble_rect, 2, border_radius=10)
     
     # Draw Triangle Tail
-    pts = [(x + 20, y), (x + 40, y), (x + 20, y + 20)]
-    pygame.draw.polygon(surface, (255, 255, 255), pts)
-    pygame.draw.line(surface, (0,0,0), pts[0], pts[2], 2)
-    pygame.draw.line(surface, (0,0,0), pts[1], pts[2], 2)
+    pts = [(20, box_h), (40, box_h), (20, box_h + 20)]
+    pygame.draw.polygon(bubble, (255, 255, 255), pts)
+    pygame.draw.line(bubble, (0,0,0), pts[0], pts[2], 2)
+    pygame.draw.line(bubble, (0,0,0), pts[1], pts[2], 2)
     
     # Draw Text
     curr_y = bubble_rect.top + padding
     for line in lines:
-        txt_surf = font.render(line, True, (0, 0, 0))
-        surface.blit(txt_surf, (bubble_rect.left + padding, curr_y))
+        txt_surf = counted(font.render(line, True, (0, 0, 0)))
+        bubble.blit(txt_surf, (bubble_rect.left + padding, curr_y))
         curr_y += font.get_linesize()
+    return prepare_surface(bubble, alpha=True)
+
+def draw_speech_bubble(surface, text, x, y, font):
+    """ Draws a speech bubble whose tail points down at (x+20, y+20) """
+    bubble = TEXT_SURFACES.get(("bubble", font, text), lambda: render_speech_bubble(text, font))
+    surface.blit(bubble, (x, y - (bubble.get_height() - BUBBLE_TAIL_HEIGHT)))
+
+class Hud:
+    """ The top score bar, re-rendered only when one of its values changes """
+    def __init__(self, font):
+        self.font = font
+        self.values = None
+        self.surface = new_surface((SCREEN_WIDTH, HUD_HEIGHT))
+
+    def draw(self, surface, score, high_score):
+        values = (score, int(score // 100), max(score, high_score))
+        if values != self.values:
+            self.values = values
+            self.surface.fill(COLOR_UI_BG)
+            render = self.font.render
+            self.surface.blit(counted(render(f"SCORE: {values[0]}", True, (255, 255, 0))), (20, 5))
+            self.surface.blit(counted(render(f"LEVEL: {values[1]}", True, (0, 255, 255))), (SCREEN_WIDTH // 2 - 50, 5))
+            self.surface.blit(counted(render(f"HIGH: {values[2]}", True, (255, 255, 255))), (SCREEN_WIDTH - 200, 5))
+        surface.blit(self.surface, (0, 0))
 
 # --- Classes ---
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.vx = random.uniform(-5, 5)
-        self.vy = random.uniform(-5, 5)
-        self.life = random.randint(30, 60)
-        self.size = random.randint(4, 8)
-        
+class ParticlePool:
+    """ Fixed-capacity explosion particles kept in NumPy arrays.
+        update() moves every particle at once and compacts the dead ones away. """
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.rng = np.random.default_rng() # Cosmetic only
+
+    def spawn(self, x, y, color, n):
+        """ Bursts up to n particles from (x, y); returns how many fit """
+        n = min(n, self.capacity - self.count)
+        if n <= 0: return 0
+        s = slice(self.count, self.count + n)
+        self.x[s] = x
+        self.y[s] = y
+        self.vx[s] = self.rng.uniform(-5, 5, n)
+        self.vy[s] = self.rng.uniform(-5, 5, n)
+        self.life[s] = self.rng.integers(30, 61, n)
+        self.size[s] = self.rng.integers(4, 9, n)
+        self.color[s] = color[:3]
+        self.count += n
+        return n
+
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 1
-        self.size = max(0, self.size - 0.1)
-        
+        c = self.count
+        if c == 0: return
+        self.x[:c] += self.vx[:c]
+        self.y[:c] += self.vy[:c]
+        self.life[:c] -= 1
+        np.maximum(self.size[:c] - 0.1, 0, out=self.size[:c])
+
+        alive = self.life[:c] > 0
+        if not alive.all():
+            k = int(alive.sum())
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color):
+                arr[:k] = arr[:c][alive]
+            self.count = k
+
     def draw(self, surface):
-        if self.life > 0:
-            pygame.draw.rect(surface, self.color, (self.x, self.y, self.size, self.size))
+        c = self.count
+        if c == 0: return
+        fill = surface.fill
+        for x, y, size, color in zip(self.x[:c].tolist(), self.y[:c].tolist(),
+                                     self.size[:c].tolist(), self.color[:c].tolist()):
+            fill(color, (x, y, size, size))
+
+    def clear(self):
+        self.count = 0
 
 class Vehicle:
-    def __init__(self, x, y, speed, v_type):
+    def __init__(self, x, y, speed, v_type, rng=random):
         self.type = v_type
         self.speed = speed
         self.y = y
         self.height = CAR_HEIGHT
+        self.rng = rng
         
         if self.type == "car":
             self.width = 70
-            self.color = random.choice([(220, 20, 60), (0, 100, 255), (255, 215, 0), (255, 69, 0), (148, 0, 211), (50, 205, 50), (0, 255, 255)])
+            self.color = rng.choice([(220, 20, 60), (0, 100, 255), (255, 215, 0), (255, 69, 0), (148, 0, 211), (50, 205, 50), (0, 255, 255)])
             self.color_top = (min(255, self.color[0]+40), min(255, self.color[1]+40), min(255, self.color[2]+40))
         elif self.type == "truck":
-            self.width = random.randint(110, 180)
-            self.color = random.choice([(220, 220, 220), (255, 250, 240), (47, 79, 79), (139, 69, 19), (70, 130, 180)])
+            self.width = rng.randint(110, 180)
+            self.color = rng.choice([(220, 220, 220), (255, 250, 240), (47, 79, 79), (139, 69, 19), (70, 130, 180)])
             self.color_cab = (30, 60, 150) 
         elif self.type == "train":
             self.width = 900
             self.color = (40, 40, 40)
 
         self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.sprite_key = (self.type, self.color, self.width, self.speed > 0)
 
     def update(self):
         self.rect.x += self.speed
         if self.speed > 0 and self.rect.left > SCREEN_WIDTH:
-            self.rect.right = 0 - random.randint(10, 100)
+            self.rect.right = 0 - self.rng.randint(10, 100)
         elif self.speed < 0 and self.rect.right < 0:
-            self.rect.left = SCREEN_WIDTH + random.randint(10, 100)
+            self.rect.left = SCREEN_WIDTH + self.rng.randint(10, 100)
 
-    def draw(self, surface):
-        x, y = self.rect.x, self.rect.y
-        w, h = self.rect.width, self.rect.height
+    def draw(self, surface, offset_y=0):
+        sprite = VEHICLE_SPRITES.get(self.sprite_key, self.render_sprite)
+        surface.blit(sprite, (self.rect.x, self.rect.y + offset_y - SPRITE_TOP_MARGIN))
+
+    def render_sprite(self):
+        """ Draws this vehicle's look once; every variant with the same sprite_key shares it """
+        w, h = self.width, self.height
+        sprite = new_surface((w + SPRITE_RIGHT_MARGIN, SPRITE_TOP_MARGIN + h + SPRITE_BOTTOM_MARGIN), pygame.SRCALPHA)
+        x, y = 0, SPRITE_TOP_MARGIN
         
         # Shadow
-        draw_rect_alpha(surface, (0,0,0, 60), (x+5, y+h-5, w-5, 8))
+        pygame.draw.rect(sprite, (0,0,0, 60), (x+5, y+h-5, w-5, 8))
 
         if self.type == "car":
-            self.draw_car(surface, x, y, w, h)
+            self.draw_car(sprite, x, y, w, h)
         elif self.type == "truck":
-            self.draw_truck(surface, x, y, w, h)
+            self.draw_truck(sprite, x, y, w, h)
         elif self.type == "train":
-            self.draw_train(surface, x, y, w, h)
+            self.draw_train(sprite, x, y, w, h)
+        return prepare_surface(sprite, alpha=True)
 
     def draw_car(self, surface, x, y, w, h):
         wheel_color = (20, 20, 20)
@@ -244,97 +434,167 @@ class Vehicle:
             pygame.draw.circle(surface, (10,10,10), (x + i, y + h), 6) 
             pygame.draw.circle(surface, (10,10,10), (x + i + 15, y + h), 6)
 
+def rect_round(values):
+    """ NumPy rounding the way Rect rounds a float position: halves away from zero """
+    return np.where(values >= 0, np.floor(values + 0.5), np.ceil(values - 0.5))
+
+def trajectory(x, speed, frames):
+    """ x after each of frames moves, rounded like Vehicle.update() rounds it. Rect rounds
+        halves away from zero, so a 5.5 px/frame car moves 6 px on one side of 0 and 5 on
+        the other; the path is two straight pieces unless float error nudges a step """
+    up = math.floor(speed + 0.5) # step while x + speed >= 0
+    down = math.ceil(speed - 0.5) # step while x + speed < 0
+    i = np.arange(frames + 1)
+    side = x >= -speed
+    path = x + i * (up if side else down)
+    crossed = (path >= -speed) != side
+    if crossed.any():
+        k = int(crossed.argmax())
+        path[k:] = path[k] + (i[k:] - k) * (down if side else up)
+    if 0 < abs(speed % 1 - 0.5) < 1e-9:
+        # e.g. 14.500000000000002 rounds like 14.5 once x is large: step it the slow way
+        rect = pygame.Rect(x, 0, 1, 1)
+        for j in range(1, frames + 1):
+            rect.x += speed
+            path[j] = rect.x
+    return path[1:]
+
 class GameOverProp:
-    def __init__(self, vehicle):
+    def __init__(self, vehicle, egg_seed=None):
         self.vehicle = vehicle 
         self.is_egg = False
+        # Each prop owns its speckle pattern; the egg is painted once, on first draw
+        self.egg_seed = egg_seed if egg_seed is not None else random.getrandbits(32)
+        self.egg_sprite = None
     
-    def draw(self, surface):
+    def draw(self, surface, offset_y=0):
         if self.is_egg:
-            cx, cy = self.vehicle.rect.centerx - 20, self.vehicle.rect.centery - 25
-            draw_realistic_egg(surface, cx, cy)
+            if self.egg_sprite is None: self.egg_sprite = render_egg(self.egg_seed)
+            cx, cy = self.vehicle.rect.centerx - 20, self.vehicle.rect.centery - 25 + offset_y
+            surface.blit(self.egg_sprite, (cx, cy))
         else:
-            self.vehicle.draw(surface)
+            self.vehicle.draw(surface, offset_y)
+
+def generate_lane_texture(lane_type, rng=random):
+    """ Paints one texture variant for a lane type """
+    surf = new_surface((SCREEN_WIDTH, GRID_SIZE))
+    w, h = SCREEN_WIDTH, GRID_SIZE
+    
+    if lane_type == 'grass':
+        surf.fill((34, 139, 34))
+        for _ in range(300):
+            gx, gy = rng.randint(0, w), rng.randint(0, h)
+            color = (45, 160, 45) if rng.random() < 0.5 else (25, 100, 25)
+            pygame.draw.line(surf, color, (gx, gy), (gx, min(gy+4, h)), 1)
+            
+    elif lane_type == 'road':
+        surf.fill((50, 50, 55))
+        pygame.draw.rect(surf, (200, 200, 200), (0, 0, w, 2))
+        pygame.draw.rect(surf, (200, 200, 200), (0, h-2, w, 2))
+        for i in range(0, w, 40):
+            pygame.draw.rect(surf, (255, 255, 255), (i, h//2 - 1, 20, 2))
+        for _ in range(20):
+            ox, oy = rng.randint(0, w), rng.randint(5, h-5)
+            pygame.draw.ellipse(surf, (40, 40, 45), (ox, oy, rng.randint(10, 30), rng.randint(5, 15)))
+
+    elif lane_type == 'rail':
+        surf.fill((100, 100, 100))
+        for _ in range(500):
+            nx, ny = rng.randint(0, w), rng.randint(0, h)
+            c = rng.randint(80, 120)
+            surf.set_at((nx, ny), (c, c, c))
+        for i in range(0, w, 40):
+            pygame.draw.rect(surf, (80, 50, 20), (i, 2, 12, h-4))
+        pygame.draw.rect(surf, (30, 30, 30), (0, 8, w, 6)) 
+        pygame.draw.rect(surf, (180, 180, 180), (0, 8, w, 4)) 
+        pygame.draw.rect(surf, (30, 30, 30), (0, h-14, w, 6)) 
+        pygame.draw.rect(surf, (180, 180, 180), (0, h-14, w, 4))
+    return surf
+
+class LaneTexturePool:
+    """ A few pre-generated, display-converted texture variants per lane type.
+        Variants are painted lazily until the cap is reached, then reused at random. """
+    def __init__(self, variants_per_type):
+        self.variants_per_type = variants_per_type
+        self.textures = {}
+        self.rng = random.Random() # Cosmetic only, never the game's RNG
+        self.converted = False
+
+    def pick(self, lane_type):
+        """ Index of the variant a new lane uses """
+        variants = self.textures.setdefault(lane_type, [])
+        if len(variants) < self.variants_per_type:
+            variants.append(prepare_surface(generate_lane_texture(lane_type, self.rng)))
+            return len(variants) - 1
+        return self.rng.randrange(len(variants))
+
+    def warm(self, lane_types=('grass', 'road', 'rail')):
+        """ Fills the pool up front so no lane pays for texture painting mid-game """
+        if not self.converted and pygame.display.get_surface() is not None:
+            for variants in self.textures.values():
+                variants[:] = [prepare_surface(v) for v in variants]
+            self.converted = True
+        for lane_type in lane_types:
+            variants = self.textures.setdefault(lane_type, [])
+            while len(variants) < self.variants_per_type:
+                variants.append(prepare_surface(generate_lane_texture(lane_type, self.rng)))
+
+    def clear(self):
+        self.textures.clear()
+        self.converted = False
+
+LANE_TEXTURES = LaneTexturePool(LANE_TEXTURE_VARIANTS)
 
 class Lane:
-    def __init__(self, y_pos, lane_type, difficulty_level=0):
+    def __init__(self, y_pos, lane_type, difficulty_level=0, rng=random, textured=True, row=0):
         self.y = y_pos
+        self.row = row
         self.height = GRID_SIZE
         self.lane_type = lane_type
         self.vehicles = []
+        self.rng = rng
         
-        # --- GENERATE STATIC TEXTURE SURFACE ---
-        self.bg_surface = pygame.Surface((SCREEN_WIDTH, GRID_SIZE))
-        self.generate_texture()
+        # --- PICK A STATIC TEXTURE SURFACE ---
+        # Headless simulations skip the texture entirely
+        self.bg_surface = None
+        self.texture_index = None # which LANE_TEXTURES variant bg_surface is
+        if textured: self.generate_texture()
 
-        base_speed = random.choice([-5, -4, -3, 3, 4, 5])
+        base_speed = rng.choice([-5, -4, -3, 3, 4, 5])
         multiplier = 1.0 + (difficulty_level * 0.1)
         self.lane_speed = base_speed * multiplier
 
         if self.lane_type == 'road':
-            if difficulty_level < 3: count = 1 if random.random() < 0.8 else 2
-            elif difficulty_level < 6: count = random.randint(1, 2)
-            else: count = random.randint(2, 3)
+            if difficulty_level < 3: count = 1 if rng.random() < 0.8 else 2
+            elif difficulty_level < 6: count = rng.randint(1, 2)
+            else: count = rng.randint(2, 3)
 
             occupied_x = []
             for _ in range(count):
                 for _ in range(10): # attempts
-                    start_x = random.randint(0, SCREEN_WIDTH)
+                    start_x = rng.randint(0, SCREEN_WIDTH)
                     if all(abs(start_x - ox) > 200 for ox in occupied_x):
-                        v_type = "car" if random.random() < 0.7 else "truck"
-                        self.vehicles.append(Vehicle(start_x, self.y + 5, self.lane_speed, v_type))
+                        v_type = "car" if rng.random() < 0.7 else "truck"
+                        self.vehicles.append(Vehicle(start_x, self.y + 5, self.lane_speed, v_type, rng))
                         occupied_x.append(start_x)
                         break
                 
         elif self.lane_type == 'rail':
-            train_speed = random.choice([-15, 15]) 
+            train_speed = rng.choice([-15, 15]) 
             final_train_speed = train_speed * (1 + difficulty_level * 0.05) 
             start_x = -900 if final_train_speed > 0 else SCREEN_WIDTH + 200
-            self.vehicles.append(Vehicle(start_x, self.y + 5, final_train_speed, "train"))
+            self.vehicles.append(Vehicle(start_x, self.y + 5, final_train_speed, "train", rng))
 
     def generate_texture(self):
-        w, h = SCREEN_WIDTH, GRID_SIZE
-        
-        if self.lane_type == 'grass':
-            self.bg_surface.fill((34, 139, 34))
-            for _ in range(300):
-                gx, gy = random.randint(0, w), random.randint(0, h)
-                color = (45, 160, 45) if random.random() < 0.5 else (25, 100, 25)
-                pygame.draw.line(self.bg_surface, color, (gx, gy), (gx, min(gy+4, h)), 1)
-                
-        elif self.lane_type == 'road':
-            self.bg_surface.fill((50, 50, 55))
-            pygame.draw.rect(self.bg_surface, (200, 200, 200), (0, 0, w, 2))
-            pygame.draw.rect(self.bg_surface, (200, 200, 200), (0, h-2, w, 2))
-            for i in range(0, w, 40):
-                pygame.draw.rect(self.bg_surface, (255, 255, 255), (i, h//2 - 1, 20, 2))
-            for _ in range(20):
-                ox, oy = random.randint(0, w), random.randint(5, h-5)
-                pygame.draw.ellipse(self.bg_surface, (40, 40, 45), (ox, oy, random.randint(10, 30), random.randint(5, 15)))
-
-        elif self.lane_type == 'rail':
-            self.bg_surface.fill((100, 100, 100))
-            for _ in range(500):
-                nx, ny = random.randint(0, w), random.randint(0, h)
-                c = random.randint(80, 120)
-                self.bg_surface.set_at((nx, ny), (c, c, c))
-            for i in range(0, w, 40):
-                pygame.draw.rect(self.bg_surface, (80, 50, 20), (i, 2, 12, h-4))
-            pygame.draw.rect(self.bg_surface, (30, 30, 30), (0, 8, w, 6)) 
-            pygame.draw.rect(self.bg_surface, (180, 180, 180), (0, 8, w, 4)) 
-            pygame.draw.rect(self.bg_surface, (30, 30, 30), (0, h-14, w, 6)) 
-            pygame.draw.rect(self.bg_surface, (180, 180, 180), (0, h-14, w, 4)) 
-
-    def move_vertical(self, amount):
-        self.y += amount
-        for v in self.vehicles: v.rect.y += amount
+        self.texture_index = LANE_TEXTURES.pick(self.lane_type)
+        self.bg_surface = LANE_TEXTURES.textures[self.lane_type][self.texture_index]
 
     def update(self):
         for v in self.vehicles: v.update()
 
-    def draw(self, surface):
-        surface.blit(self.bg_surface, (0, self.y))
-        for v in self.vehicles: v.draw(surface)
+    def draw(self, surface, offset_y=0):
+        surface.blit(self.bg_surface, (0, self.y + offset_y))
+        for v in self.vehicles: v.draw(surface, offset_y)
 
 class Player:
     def __init__(self):
@@ -347,46 +607,293 @@ class Player:
         elif dx < 0: self.facing_right = False
         if self.rect.left < 0: self.rect.left = 0
         if self.rect.right > SCREEN_WIDTH: self.rect.right = SCREEN_WIDTH
-    def draw(self, surface):
-        draw_chicken(surface, self.rect, self.facing_right)
+    def draw(self, surface, offset_y=0):
+        draw_chicken(surface, self.rect.move(0, offset_y), self.facing_right)
 
-def get_random_lane_type(difficulty_level):
-    rnd = random.random()
+def get_random_lane_type(difficulty_level, rng=random):
+    rnd = rng.random()
     grass_chance = max(0.1, 0.4 - (difficulty_level * 0.03)) 
     rail_chance = min(0.3, 0.1 + (difficulty_level * 0.02))  
     if rnd < rail_chance: return 'rail'
     elif rnd < rail_chance + (1.0 - grass_chance - rail_chance): return 'road'
     else: return 'grass'
 
+# --- Simulation ---
+
+ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN = range(5)
+ACTION_DELTAS = {
+    ACTION_LEFT: (-GRID_SIZE, 0),
+    ACTION_RIGHT: (GRID_SIZE, 0),
+    ACTION_UP: (0, -GRID_SIZE),
+    ACTION_DOWN: (0, GRID_SIZE),
+}
+# The same as arrays indexed by action, ACTION_NONE included, for simulators that move
+# many players at once
+ACTION_DX = np.zeros(max(ACTION_DELTAS) + 1, dtype=np.int64)
+ACTION_DY = np.zeros(max(ACTION_DELTAS) + 1, dtype=np.int64)
+for _action, (_dx, _dy) in ACTION_DELTAS.items():
+    ACTION_DX[_action], ACTION_DY[_action] = _dx, _dy
+
+VEHICLE_TYPES = ("car", "truck", "train")
+DEATH_CAUSES = VEHICLE_TYPES + ("scrolled",) # GameState.death_cause; array simulators store the index, -1 alive
+CAUSE_SCROLLED = DEATH_CAUSES.index("scrolled")
+
+HITBOX_SHRINK = 15 # Collisions use the player rect shrunk by this much
+HITBOX_INSET = HITBOX_SHRINK // 2 # where Rect.inflate() puts the shrunk rect
+HITBOX_SIZE = PLAYER_SIZE - HITBOX_SHRINK
+
+def row_y(row):
+    """ World y of a lane row. Row 0 is the bottom starting lane; rows count upwards """
+    return SCREEN_HEIGHT - row * GRID_SIZE
+
+def row_at(y):
+    """ The lane row containing world y """
+    return (SCREEN_HEIGHT - y + GRID_SIZE - 1) // GRID_SIZE
+
+class LaneStream:
+    """ The endless column of lanes for one seed. Lane content (type, speed, vehicles and
+        their respawn gaps) is a pure function of (seed, row, difficulty), drawn from an RNG
+        of its own, so lanes can be built ahead of time in any order without changing the game.
+
+        prefetch() builds the next few lanes during idle frame time; take() then just hands
+        a ready lane over, rebuilding it only if the difficulty moved on since prefetch. """
+    def __init__(self, seed, textured=True, lookahead=LANE_LOOKAHEAD):
+        self.seed = seed
+        self.textured = textured
+        self.lookahead = lookahead
+        self.ready = {} # row -> (difficulty_level, Lane)
+        self.built = 0
+        self.rebuilt = 0 # prefetched at one difficulty, spawned at another
+
+    def lane_rng(self, row):
+        return random.Random(f"{self.seed}:{row}")
+
+    def build(self, row, difficulty_level):
+        rng = self.lane_rng(row)
+        l_type = 'grass' if row < START_GRASS_ROWS else get_random_lane_type(difficulty_level, rng)
+        self.built += 1
+        return Lane(row_y(row), l_type, difficulty_level, rng, self.textured, row)
+
+    def take(self, row, difficulty_level):
+        """ The lane for row, ready-made if prefetched at this difficulty """
+        entry = self.ready.pop(row, None)
+        if entry is not None:
+            if entry[0] == difficulty_level: return entry[1]
+            self.rebuilt += 1
+        return self.build(row, difficulty_level)
+
+    def prefetch(self, next_row, difficulty_level, budget=1):
+        """ Builds up to budget of the lookahead lanes from next_row on that aren't ready yet """
+        for row in [r for r in self.ready if r < next_row]: del self.ready[row]
+        for row in range(next_row, next_row + self.lookahead):
+            if budget <= 0: break
+            entry = self.ready.get(row)
+            if entry is None or entry[0] != difficulty_level:
+                self.ready[row] = (difficulty_level, self.build(row, difficulty_level))
+                budget -= 1
+
+class GameState:
+    """ The game rules without a window: lanes, vehicles, player, scroll, score and death.
+        One step() is one frame at FPS. Pass textured=True when something will draw the lanes.
+
+        Lanes, vehicles and the player keep fixed world coordinates; scrolling only moves
+        camera_y, and screen y = world y + camera_y. Lanes sit in a deque ordered bottom to
+        top by row, so culling and spawning touch only its ends. """
+    def __init__(self, seed=None, textured=False):
+        self.textured = textured
+        self.profiler = None # A FrameProfiler gets a lap() after each phase of step()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.lane_stream = LaneStream(self.seed, self.textured)
+        self.player = Player()
+        self.lanes = deque()
+
+        # Per difficulty level: frames played, and lanes spawned of each LANE_TYPES type
+        self.level_frames = [0]
+        self.lane_mix = [[0, 0, 0]]
+
+        # Init Lanes
+        for i in range(int(SCREEN_HEIGHT / GRID_SIZE) + 2):
+            self.lanes.append(self.lane_stream.take(i, 0))
+            if i >= START_GRASS_ROWS: self.lane_mix[0][LANE_TYPE_INDEX[self.lanes[-1].lane_type]] += 1
+
+        self.camera_y = 0 # Every pixel scrolled, automatic or player driven
+        self.total_scroll_y = 0 # Player driven scroll only, this is what scores
+        self.score = 0
+        self.frame = 0
+        self.scroll_accumulator = 0.0
+        self.game_over = False
+        self.death_cause = None # "car", "truck", "train" or "scrolled"
+        return self
+
+    @property
+    def difficulty_level(self):
+        return int(self.score // 100)
+
+    def to_screen(self, rect):
+        return rect.move(0, self.camera_y)
+
+    def lane_at_row(self, row):
+        """ The lane on a grid row, or None if that row is culled or not spawned yet """
+        index = row - self.lanes[0].row
+        if 0 <= index < len(self.lanes): return self.lanes[index]
+        return None
+
+    def lanes_spanned(self, rect):
+        """ Lanes a world-space rect overlaps, bottom row first """
+        bottom_row = row_at(rect.bottom - 1)
+        top_row = row_at(rect.top)
+        lanes = []
+        for row in range(bottom_row, top_row + 1):
+            lane = self.lane_at_row(row)
+            if lane is not None: lanes.append(lane)
+        return lanes
+
+    def kill(self, cause):
+        if not self.game_over:
+            self.game_over = True
+            self.death_cause = cause
+
+    def step(self, action=ACTION_NONE):
+        """ Advances one frame. Returns (reward, done) where reward is the score gained """
+        if self.game_over: return 0, True
+        player = self.player
+        prev_score = self.score
+        prof = self.profiler
+
+        if action in ACTION_DELTAS: player.move(*ACTION_DELTAS[action])
+
+        difficulty_level = self.difficulty_level
+        self.frame += 1
+        while len(self.level_frames) <= difficulty_level:
+            self.level_frames.append(0)
+            self.lane_mix.append([0, 0, 0])
+        self.level_frames[difficulty_level] += 1
+
+        # --- AUTO SCROLL (WITH DELAY) ---
+        if self.frame > SCROLL_DELAY_FRAMES:
+            auto_scroll_speed = 0.5 + (difficulty_level * 0.1)
+            if auto_scroll_speed > 3.0: auto_scroll_speed = 3.0
+
+            self.scroll_accumulator += auto_scroll_speed
+            whole_pixels = int(self.scroll_accumulator)
+            self.camera_y += whole_pixels
+            self.scroll_accumulator -= whole_pixels
+
+        # Player input Scroll
+        player_top = player.rect.top + self.camera_y
+        if player_top < SCROLL_THRESHOLD:
+            scroll_amount = SCROLL_THRESHOLD - player_top
+            self.camera_y += scroll_amount
+            self.total_scroll_y += scroll_amount
+            self.score = int(self.total_scroll_y // GRID_SIZE) * 10
+
+        # Death Check
+        if player.rect.bottom + self.camera_y >= SCREEN_HEIGHT:
+            self.kill("scrolled")
+        if prof is not None: prof.lap("scroll")
+
+        # Lane Management
+        lanes = self.lanes
+        while lanes and lanes[0].y + self.camera_y >= SCREEN_HEIGHT:
+            lanes.popleft()
+        if lanes[-1].y + self.camera_y > -GRID_SIZE:
+            lanes.append(self.lane_stream.take(lanes[-1].row + 1, difficulty_level))
+            self.lane_mix[difficulty_level][LANE_TYPE_INDEX[lanes[-1].lane_type]] += 1
+        if prof is not None: prof.lap("lanes")
+
+        # Vehicle Updates
+        for lane in lanes:
+            lane.update()
+        if prof is not None: prof.lap("vehicles")
+
+        # Collision: only the rows the hitbox spans can hold a vehicle touching it
+        player_hitbox = player.rect.inflate(-HITBOX_SHRINK, -HITBOX_SHRINK)
+        for lane in self.lanes_spanned(player_hitbox):
+            for v in lane.vehicles:
+                if player_hitbox.colliderect(v.rect):
+                    self.kill(v.type)
+        if prof is not None: prof.lap("collision")
+
+        return self.score - prev_score, self.game_over
+
+def draw_world(surface, state):
+    """ Renders the lanes and vehicles of a textured GameState """
+    surface.fill((34, 139, 34)) 
+    for lane in state.lanes: 
+        lane.draw(surface, state.camera_y) 
+
 # --- Main Game Loop ---
 
-def game_loop(current_high_score):
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+KEY_ACTIONS = {
+    pygame.K_LEFT: ACTION_LEFT,
+    pygame.K_RIGHT: ACTION_RIGHT,
+    pygame.K_UP: ACTION_UP,
+    pygame.K_DOWN: ACTION_DOWN,
+}
+
+class GameWindow:
+    """ The display surface, fonts and screen-sized drawing objects, shared by every game_loop().
+        Built by the first game; restarts reuse them instead of reopening the window """
+    def __init__(self):
+        self.screen = None
+
+    def open(self):
+        screen = pygame.display.get_surface()
+        if screen is None or screen.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT):
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if screen is not self.screen or not pygame.font.get_init(): # first game, or pygame was restarted
+            self.screen = screen
+            self.font = load_font("Arial", 28, bold=True)
+            self.big_font = load_font("Arial", 80, bold=True)
+            self.joke_font = load_font("Arial", 20)
+            self.profile_font = load_font("Courier", 14, bold=True)
+            self.hud = Hud(self.font)
+            self.danger_overlay = DangerOverlay()
+            self.particles = ParticlePool()
+        return self
+
+WINDOW = GameWindow()
+FIRST_FRAMES = [] # (game_loop() entered, first frame shown) perf_counter pairs, one per game
+
+def report_startup(launched, out=sys.stderr):
+    """ Time from launch to the first game's first frame, and from each restart to its first frame """
+    if not FIRST_FRAMES: return
+    restarts = sorted(shown - entered for entered, shown in FIRST_FRAMES[1:])
+    line = f"startup: first frame {(FIRST_FRAMES[0][1] - launched) * 1000:.0f} ms after launch"
+    if restarts:
+        line += f", restart to first frame {restarts[len(restarts) // 2] * 1000:.1f} ms median over {len(restarts)}"
+    print(line, file=out)
+
+def game_loop(current_high_score, seed=None, controller=None, recorder=None, profiler=None, capture=None):
+    """ Plays one game in the window and returns its finished GameState.
+        controller(state) -> action replaces the arrow keys (AI or replay playback),
+        and recorder.record(action) receives the action fed to every simulated frame.
+        A FrameCapture gets every presented frame.
+        A FrameProfiler times every phase of the frame; F3 toggles its overlay. """
+    entered = time.perf_counter()
+    window = WINDOW.open()
+    screen = window.screen
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 28, bold=True)
-    big_font = pygame.font.SysFont("Arial", 80, bold=True) 
-    joke_font = pygame.font.SysFont("Arial", 20)
+    font, big_font, joke_font, profile_font = window.font, window.big_font, window.joke_font, window.profile_font
+
+    LANE_TEXTURES.warm()
+    state = GameState(seed, textured=True)
+    state.profiler = profiler
+    show_profile = False
+    player = state.player
+    pending_actions = [] # Key presses are fed to the simulation one per frame
+    danger_overlay = window.danger_overlay
 
-    player = Player()
-    lanes = []
-    
-    # Init Lanes
-    for i in range(int(SCREEN_HEIGHT / GRID_SIZE) + 2):
-        y = SCREEN_HEIGHT - (i * GRID_SIZE)
-        if i < 4: l_type = 'grass'
-        else: l_type = get_random_lane_type(0) 
-        lanes.append(Lane(y, l_type, 0))
-
-    total_scroll_y = 0 
-    score = 0
     running = True
     game_over = False
-    scroll_accumulator = 0.0
-    start_ticks = pygame.time.get_ticks()
 
     # Animation State Variables
     game_over_state = "PLAYING" 
-    particles = []
+    particles = window.particles
+    particles.clear()
     game_over_items = [] 
     
     # Text/Joke Animation Variables
@@ -399,74 +906,54 @@ def game_loop(current_high_score):
     explosion_interval = 0
     current_joke = ""
     narrator_rect = pygame.Rect(30, SCREEN_HEIGHT - 120, 80, 80)
+    hud = window.hud
+    waiting_frame = None
+
+    retry = render_text(font, "Press SPACE to Retry", (255, 255, 255))
+    retry_rect = retry.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+    retry_bg_rect = retry_rect.inflate(20, 20)
+    def draw_retry(surface):
+        pygame.draw.rect(surface, (0,0,0), retry_bg_rect)
+        surface.blit(retry, retry_rect)
 
     while running:
+        if profiler is not None: profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
-            if event.type == pygame.KEYDOWN:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if profiler is None:
+                    profiler = state.profiler = FrameProfiler()
+                    profiler.begin_frame()
+                show_profile = not show_profile
+                waiting_frame = None
+            elif event.type == pygame.KEYDOWN:
                 if not game_over:
-                    if event.key == pygame.K_LEFT: player.move(-GRID_SIZE, 0)
-                    elif event.key == pygame.K_RIGHT: player.move(GRID_SIZE, 0)
-                    elif event.key == pygame.K_UP: player.move(0, -GRID_SIZE)
-                    elif event.key == pygame.K_DOWN: player.move(0, GRID_SIZE)
+                    if event.key in KEY_ACTIONS and controller is None: pending_actions.append(KEY_ACTIONS[event.key])
                 else:
                     if game_over_state == "WAITING" and event.key == pygame.K_SPACE: 
-                        return score 
+                        return state
+        if profiler is not None: profiler.lap("events")
 
         if not game_over:
             # --- NORMAL GAMEPLAY ---
-            difficulty_level = int(score // 100)
-            current_time = pygame.time.get_ticks()
-            
-            # --- AUTO SCROLL (WITH DELAY) ---
-            if current_time - start_ticks > 2000:
-                auto_scroll_speed = 0.5 + (difficulty_level * 0.1)
-                if auto_scroll_speed > 3.0: auto_scroll_speed = 3.0
-                
-                scroll_accumulator += auto_scroll_speed
-                while scroll_accumulator >= 1.0:
-                    player.rect.y += 1
-                    for lane in lanes: lane.move_vertical(1)
-                    scroll_accumulator -= 1.0
-
-            # Player input Scroll
-            if player.rect.top < SCROLL_THRESHOLD:
-                scroll_amount = SCROLL_THRESHOLD - player.rect.top
-                player.rect.y += scroll_amount
-                total_scroll_y += scroll_amount
-                score = int(total_scroll_y // GRID_SIZE) * 10
-                for lane in lanes: lane.move_vertical(scroll_amount)
-            
-            # Death Check
-            if player.rect.bottom >= SCREEN_HEIGHT:
+            if controller is not None: action = controller(state)
+            else: action = pending_actions.pop(0) if pending_actions else ACTION_NONE
+            if recorder is not None: recorder.record(action)
+            if profiler is not None: profiler.lap("controller")
+            state.step(action)
+            if state.game_over:
                 game_over = True
                 game_over_state = "INIT_EXPLOSION"
-
-            # Lane Management
-            lanes = [lane for lane in lanes if lane.y < SCREEN_HEIGHT]
-            min_y = min(lane.y for lane in lanes)
-            if min_y > -GRID_SIZE:
-                new_y = min_y - GRID_SIZE
-                l_type = get_random_lane_type(difficulty_level)
-                lanes.append(Lane(new_y, l_type, difficulty_level))
-
-            # Vehicle Updates
-            player_hitbox = player.rect.inflate(-15, -15)
-            for lane in lanes:
-                lane.update()
-                for v in lane.vehicles:
-                    if player_hitbox.colliderect(v.rect):
-                        game_over = True
-                        game_over_state = "INIT_EXPLOSION"
         
         else:
             # --- GAME OVER SEQUENCE ---
             if game_over_state == "INIT_EXPLOSION":
-                for lane in lanes:
+                for lane in state.lanes:
                     for v in lane.vehicles:
-                        if v.rect.bottom > 0 and v.rect.top < SCREEN_HEIGHT:
+                        v_screen = state.to_screen(v.rect)
+                        if v_screen.bottom > 0 and v_screen.top < SCREEN_HEIGHT:
                             game_over_items.append(GameOverProp(v))
                     lane.vehicles = []
                 
@@ -476,8 +963,8 @@ def game_loop(current_high_score):
                 else:
                     explosion_interval = 10
                 
-                for _ in range(20):
-                    particles.append(Particle(player.rect.centerx, player.rect.centery, (255, 255, 255)))
+                player_screen = state.to_screen(player.rect)
+                particles.spawn(player_screen.centerx, player_screen.centery, (255, 255, 255), PLAYER_BURST_PARTICLES)
                 
                 game_over_state = "EXPLODING_SEQUENCE"
 
@@ -488,8 +975,8 @@ def game_loop(current_high_score):
                         item = game_over_items[explosion_index]
                         item.is_egg = True
                         v = item.vehicle
-                        for _ in range(15): 
-                            particles.append(Particle(v.rect.centerx, v.rect.centery, v.color))
+                        v_screen = state.to_screen(v.rect)
+                        particles.spawn(v_screen.centerx, v_screen.centery, v.color, VEHICLE_BURST_PARTICLES)
                         explosion_index += 1
                         explosion_timer = 0
                 else:
@@ -511,44 +998,50 @@ def game_loop(current_high_score):
                          game_over_state = "WAITING"
                          current_joke = random.choice(CHICKEN_JOKES)
 
-            for p in particles:
-                p.update()
+            if profiler is not None: profiler.lap("game_over")
+            particles.update()
+            if profiler is not None: profiler.lap("particles")
 
         # --- DRAWING ---
-        screen.fill((34, 139, 34)) 
-        for lane in lanes: 
-            lane.draw(screen) 
+        if game_over_state == "WAITING" and waiting_frame is not None:
+            # Nothing moves while waiting except the blinking prompt: patch just its rect
+            screen.blit(waiting_frame, retry_bg_rect, retry_bg_rect)
+            if int(time.perf_counter() * 2) % 2 == 0: draw_retry(screen) # on half of every second
+            pygame.display.update(retry_bg_rect)
+            if profiler is not None: profiler.lap("flip")
+            if capture is not None:
+                capture.capture(screen)
+                if profiler is not None: profiler.lap("capture")
+            clock.tick(FPS)
+            if profiler is not None:
+                profiler.lap("wait")
+                profiler.end_frame()
+            continue
+
+        draw_world(screen, state)
+        if profiler is not None: profiler.lap("draw_lanes")
         
         if game_over:
             for item in game_over_items:
-                item.draw(screen)
+                item.draw(screen, state.camera_y)
         else:
-            player.draw(screen)
+            player.draw(screen, state.camera_y)
+        if profiler is not None: profiler.lap("draw_actors")
 
-        for p in particles:
-            p.draw(screen)
+        particles.draw(screen)
+        if profiler is not None: profiler.lap("particles")
 
-        if not game_over and player.rect.bottom > SCREEN_HEIGHT - 100:
-            s = pygame.Surface((SCREEN_WIDTH, 100))
-            s.set_alpha(50 + int((player.rect.bottom - (SCREEN_HEIGHT-100))*1.5))
-            s.fill((255, 0, 0))
-            screen.blit(s, (0, SCREEN_HEIGHT-100))
+        player_bottom = player.rect.bottom + state.camera_y
+        if not game_over and player_bottom > SCREEN_HEIGHT - 100:
+            danger_overlay.draw(screen, 50 + int((player_bottom - (SCREEN_HEIGHT-100))*1.5))
 
         # UI Overlay
-        pygame.draw.rect(screen, COLOR_UI_BG, (0, 0, SCREEN_WIDTH, 40))
-        score_text = font.render(f"SCORE: {score}", True, (255, 255, 0))
-        level_text = font.render(f"LEVEL: {int(score // 100)}", True, (0, 255, 255))
-        hs_text = font.render(f"HIGH: {max(score, current_high_score)}", True, (255, 255, 255))
-        screen.blit(score_text, (20, 5))
-        screen.blit(level_text, (SCREEN_WIDTH // 2 - 50, 5))
-        screen.blit(hs_text, (SCREEN_WIDTH - 200, 5))
+        hud.draw(screen, state.score, current_high_score)
 
         # Scattered Letters
         for char, lx, ly, lc in scattered_letters:
-            txt = big_font.render(char, True, lc)
-            txt_bg = big_font.render(char, True, (0,0,0))
-            screen.blit(txt_bg, (lx+4, ly+4)) 
-            screen.blit(txt, (lx, ly))
+            screen.blit(render_text(big_font, char, (0,0,0)), (lx+4, ly+4)) 
+            screen.blit(render_text(big_font, char, lc), (lx, ly))
 
         # Retry Text & Joke
         if game_over_state == "WAITING":
@@ -556,24 +1049,96 @@ def game_loop(current_high_score):
             draw_chicken(screen, narrator_rect, True, scale=2.0)
             # Draw Joke
             draw_speech_bubble(screen, current_joke, narrator_rect.right + 10, narrator_rect.top, joke_font)
+            # Keep the finished scene so later frames only repaint the prompt
+            waiting_frame = counted(screen.copy())
+
+            if int(time.perf_counter() * 2) % 2 == 0: draw_retry(screen) # on half of every second
 
-            if (pygame.time.get_ticks() // 500) % 2 == 0:
-                retry = font.render("Press SPACE to Retry", True, (255, 255, 255))
-                bg_rect = retry.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-                bg_rect.inflate_ip(20, 20)
-                pygame.draw.rect(screen, (0,0,0), bg_rect)
-                screen.blit(retry, retry.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2)))
+        if show_profile: profiler.draw_overlay(screen, profile_font)
+        if profiler is not None: profiler.lap("hud")
 
         pygame.display.flip()
+        if profiler is not None: profiler.lap("flip")
+        if entered is not None:
+            FIRST_FRAMES.append((entered, time.perf_counter()))
+            entered = None
+        if capture is not None:
+            capture.capture(screen)
+            if profiler is not None: profiler.lap("capture")
+
+        # Spare frame time builds the lanes about to scroll in
+        if not game_over:
+            state.lane_stream.prefetch(state.lanes[-1].row + 1, state.difficulty_level)
+            if profiler is not None: profiler.lap("prefetch")
         clock.tick(FPS)
+        if profiler is not None:
+            profiler.lap("wait")
+            profiler.end_frame()
 
 def main():
-    pygame.init()
+    launched = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Crossy Road - The Joke's On You")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first game, later games count up")
+    parser.add_argument("--record", metavar="DIR", default=None, help="save a replay of every game into DIR")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="time every frame phase and export on exit (.csv, .json or .trace.json)")
+    parser.add_argument("--ai", action="store_true", help="let the path-planning AI play")
+    parser.add_argument("--capture", metavar="DIR", default=None, help="save the frames of every game into DIR")
+    parser.add_argument("--capture-format", choices=("raw", "png"), default="raw")
+    parser.add_argument("--capture-every", type=int, default=1, metavar="N", help="capture one frame in N")
+    parser.add_argument("--capture-scale", type=int, default=1, metavar="N", help="keep one pixel in N per axis")
+    parser.add_argument("--stats", metavar="FILE", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "crossy_stats.crst"),
+                        help="append every game to this statistics file, which also keeps the high score ('' to disable)")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile:
+        profiler = FrameProfiler()
+        atexit.register(profiler.export, args.profile)
+    controller = None
+    if args.ai:
+        from crossy_ai import PathPlanner
+        controller = PathPlanner()
+
+    atexit.register(report_startup, launched)
+    pygame.display.init() # The game has no sound, so audio is never started
+    pygame.font.init()
     pygame.display.set_caption("Crossy Road - The Joke's On You")
     high_score = 0
+    store = None
+    if args.stats:
+        from crossy_stats import EpisodeStats, StatsStore
+        store = StatsStore(args.stats)
+        try: high_score = store.load().max_score
+        except ValueError as e: # keep the file for a look, play without statistics
+            print(f"ignoring --stats: {e}", file=sys.stderr)
+            store = None
+    seed = args.seed if args.seed is not None else random.getrandbits(32)
+    game_number = 0
     while True:
-        last_score = game_loop(high_score)
+        recorder = None
+        if args.record:
+            from crossy_replay import Recorder
+            os.makedirs(args.record, exist_ok=True)
+            recorder = Recorder(seed)
+        capture = None
+        if args.capture:
+            from crossy_capture import FrameCapture
+            capture = FrameCapture(os.path.join(args.capture, f"game-{game_number}"), args.capture_format,
+                                   args.capture_every, args.capture_scale)
+        try: state = game_loop(high_score, seed, controller, recorder, profiler, capture)
+        finally:
+            if capture is not None: capture.close() # also when the window is closed mid-game
+        last_score = state.score
+        if store is not None:
+            stats = EpisodeStats()
+            stats.add_state(state)
+            store.append(stats)
+        if recorder is not None:
+            recorder.finish(last_score).save(os.path.join(args.record, f"game-{game_number}-{last_score}.crr"))
         if last_score > high_score: high_score = last_score
+        seed += 1
+        game_number += 1
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,194 @@
+""" Process-pool rollout and tournament runner for chicken-controlling policies.
+
+Episodes (one policy + one seed each) run headless GameStates in a process pool and
+stream their results back as they finish. Results are appended to a JSON-lines file,
+so an interrupted run can be resumed and only the missing episodes are played.
+
+A policy is named by "module:attribute". The attribute is a factory called once per
+episode with the episode seed; it returns a callable mapping a GameState to an action.
+
+    python crossy_runner.py --policies crossy_runner:random_policy,crossy_runner:forward_policy \\
+        --seeds 0-999 --workers 8 --out results.jsonl --resume
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from crossy_roads import GameState, FPS, ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN
+
+MAX_EPISODE_FRAMES = 10 * 60 * FPS # 10 minutes of play
+STATS_FLUSH_EPISODES = 1000 # Episodes aggregated between appends to --stats
+
+# --- Built-in policies ---
+
+def random_policy(seed):
+    """ Presses a random key (or nothing) every frame """
+    rng = random.Random(seed)
+    actions = [ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN]
+    return lambda state: rng.choice(actions)
+
+def forward_policy(seed):
+    """ Hops forward every few frames, sidestepping at random """
+    rng = random.Random(seed)
+    def act(state):
+        if state.frame % 12: return ACTION_NONE
+        r = rng.random()
+        if r < 0.7: return ACTION_UP
+        return ACTION_LEFT if r < 0.85 else ACTION_RIGHT
+    return act
+
+def load_policy(spec):
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+# --- Episodes ---
+
+def run_episode(policy_spec, seed, max_frames=MAX_EPISODE_FRAMES):
+    """ Plays one headless game and returns its result record """
+    start = time.perf_counter()
+    act = load_policy(policy_spec)(seed)
+    state = GameState(seed)
+    while not state.game_over and state.frame < max_frames:
+        state.step(act(state))
+    return {
+        "policy": policy_spec,
+        "seed": seed,
+        "score": state.score,
+        "steps": state.frame,
+        "death_cause": state.death_cause,
+        "level": state.difficulty_level,
+        "level_frames": state.level_frames,
+        "lane_mix": state.lane_mix,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+def _run_chunk(episodes, max_frames):
+    return [run_episode(policy, seed, max_frames) for policy, seed in episodes]
+
+def load_records(path):
+    """ Every complete record in a results file """
+    records = []
+    if not os.path.exists(path): return records
+    with open(path) as f:
+        for line in f:
+            try: records.append(json.loads(line))
+            except ValueError: continue # torn last line from an interrupted run
+    return records
+
+def load_completed(path):
+    """ (policy, seed) pairs already recorded in a results file """
+    return {(rec["policy"], rec["seed"]) for rec in load_records(path)}
+
+def drop_torn_tail(path):
+    """ Cuts a results file back to its last complete line, so appending starts a fresh one """
+    if not os.path.exists(path): return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data.endswith(b"\n") or not data: return
+        f.truncate(data.rfind(b"\n") + 1)
+
+def run_tournament(policies, seeds, workers=None, chunk_size=4, max_frames=MAX_EPISODE_FRAMES, skip=()):
+    """ Yields a result dict per episode, in completion order.
+        Episodes are sent to the pool in small chunks to keep IPC cheap while still
+        streaming, and only 2 chunks per worker are in flight at a time. """
+    skip = set(skip)
+    episodes = [(p, s) for s in seeds for p in policies if (p, s) not in skip]
+    chunks = [episodes[i:i + chunk_size] for i in range(0, len(episodes), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        chunk_iter = iter(chunks)
+        while True:
+            while len(pending) < workers * 2:
+                chunk = next(chunk_iter, None)
+                if chunk is None: break
+                pending.add(pool.submit(_run_chunk, chunk, max_frames))
+            if not pending: break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+
+def summarize(results):
+    """ Mean/max score, mean steps and death causes per policy """
+    table = {}
+    for rec in results:
+        row = table.setdefault(rec["policy"], {"episodes": 0, "score_sum": 0, "max_score": 0, "steps_sum": 0, "causes": {}})
+        row["episodes"] += 1
+        row["score_sum"] += rec["score"]
+        row["steps_sum"] += rec["steps"]
+        row["max_score"] = max(row["max_score"], rec["score"])
+        cause = rec["death_cause"] or "alive"
+        row["causes"][cause] = row["causes"].get(cause, 0) + 1
+    return table
+
+def parse_seeds(text):
+    """ "0-99,200,300-309" -> list of ints """
+    seeds = []
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        seeds.extend(range(int(lo), int(hi) + 1) if hi else [int(lo)])
+    return seeds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run policies against many seeds in a process pool")
+    parser.add_argument("--policies", default="crossy_runner:random_policy,crossy_runner:forward_policy")
+    parser.add_argument("--seeds", default="0-99")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=4)
+    parser.add_argument("--max-frames", type=int, default=MAX_EPISODE_FRAMES)
+    parser.add_argument("--out", default="results.jsonl")
+    parser.add_argument("--resume", action="store_true", help="skip episodes already in --out")
+    parser.add_argument("--stats", metavar="FILE", default=None,
+                        help="also aggregate episodes into this crossy_stats file, appending every "
+                             f"{STATS_FLUSH_EPISODES} episodes")
+    args = parser.parse_args(argv)
+
+    policies = args.policies.split(",")
+    seeds = parse_seeds(args.seeds)
+    skip = load_completed(args.out) if args.resume else set()
+    if args.resume: drop_torn_tail(args.out)
+    if not args.resume and os.path.exists(args.out): open(args.out, "w").close()
+
+    stats = store = None
+    if args.stats:
+        from crossy_stats import EpisodeStats, StatsStore
+        stats, store = EpisodeStats(), StatsStore(args.stats)
+        if args.resume:
+            # Episodes flushed to --stats and --out can differ after a crash (a torn --out line
+            # is replayed, unflushed stats are lost), so start again from what --out holds
+            for rec in load_records(args.out): stats.add_record(rec)
+            store.rewrite(stats)
+            stats = EpisodeStats()
+
+    start = time.perf_counter()
+    count = 0
+    try:
+        with open(args.out, "a") as out:
+            for rec in run_tournament(policies, seeds, args.workers, args.chunk_size, args.max_frames, skip):
+                out.write(json.dumps(rec) + "\n")
+                out.flush()
+                count += 1
+                if stats is not None:
+                    stats.add_record(rec)
+                    if stats.episodes >= STATS_FLUSH_EPISODES:
+                        store.append(stats)
+                        stats = EpisodeStats()
+                print(f"{rec['policy']} seed={rec['seed']} score={rec['score']} steps={rec['steps']} "
+                      f"death={rec['death_cause']} level={rec['level']}")
+    finally:
+        if stats is not None: store.append(stats)
+    elapsed = time.perf_counter() - start
+    print(f"{count} episodes in {elapsed:.1f}s ({len(skip)} resumed)", file=sys.stderr)
+
+    for policy, row in summarize(load_records(args.out)).items():
+        n = row["episodes"]
+        print(f"{policy}: {n} episodes, mean score {row['score_sum'] / n:.1f}, max {row['max_score']}, "
+              f"mean steps {row['steps_sum'] / n:.0f}, deaths {row['causes']}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
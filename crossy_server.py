@@ -0,0 +1,338 @@
+""" Socket server that lets external agents (any process, any language) play headless games.
+
+An asyncio server on a Unix domain socket or localhost TCP holds any number of game
+sessions (a GameState each, plus a GridObserver once observed). Every message is a
+little-endian length-prefixed frame:
+
+    frame    = u32 payload_length, payload
+    payload  = u8 op, u8 flags, u16 count, count fixed-size items
+    response = same header (op echoed, or OP_ERROR followed by a UTF-8 message), items
+
+    op          request item             response items
+    OP_INFO     -                        one INFO record
+    OP_CREATE   one (u8 has_seed, i64 seed), count = sessions wanted   count u32 session ids
+    OP_RESET    (u32 session, u8 has_seed, i64 seed)   STATE records
+    OP_STEP     (u32 session, u8 action)               STATE records [+ observations]
+    OP_OBSERVE  (u32 session)                          STATE records + observations
+    OP_CLOSE    (u32 session)                          -
+
+One OP_STEP request steps many sessions, so a batch of agents pays one round trip per
+frame. With FLAG_OBSERVE (always on for OP_OBSERVE) the STATE records are followed by
+count float32 grids of shape (CHANNELS, OBS_ROWS, OBS_COLS), laid out as in crossy_obs.
+
+    python crossy_server.py serve --unix /tmp/crossy.sock
+    python crossy_server.py loadgen --spawn --clients 4 --sessions 64 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from crossy_roads import GameState, ACTION_DOWN, DEATH_CAUSES
+from crossy_obs import GridObserver, CHANNELS, OBS_ROWS, OBS_COLS
+from crossy_profiler import percentile
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 7717
+MAX_FRAME = 16 * 1024 * 1024
+
+OP_INFO, OP_CREATE, OP_RESET, OP_STEP, OP_OBSERVE, OP_CLOSE = range(1, 7)
+OP_ERROR = 0xFF
+FLAG_OBSERVE = 1
+
+FRAME = struct.Struct("<I")
+HEADER = struct.Struct("<BBH")
+INFO = struct.Struct("<HHHH") # protocol version, channels, rows, columns
+CREATE_ITEM = np.dtype([("has_seed", "u1"), ("seed", "<i8")])
+RESET_ITEM = np.dtype([("session", "<u4"), ("has_seed", "u1"), ("seed", "<i8")])
+STEP_ITEM = np.dtype([("session", "<u4"), ("action", "u1")])
+SESSION_ITEM = np.dtype([("session", "<u4")])
+# death is an index into DEATH_CAUSES, -1 while alive
+STATE = np.dtype([("session", "<u4"), ("reward", "<i4"), ("done", "u1"),
+                  ("frame", "<u4"), ("score", "<u4"), ("death", "i1")])
+REQUEST_ITEMS = {OP_CREATE: CREATE_ITEM, OP_RESET: RESET_ITEM, OP_STEP: STEP_ITEM,
+                 OP_OBSERVE: SESSION_ITEM, OP_CLOSE: SESSION_ITEM}
+
+class ProtocolError(Exception):
+    pass
+
+# --- Server ---
+
+class Session:
+    def __init__(self, seed):
+        self.state = GameState(seed)
+        self.observer = None # built on first observation
+        self.last_reward = 0
+
+    def observe(self):
+        if self.observer is None: self.observer = GridObserver(self.state)
+        return self.observer.update()
+
+class GameServer:
+    """ Sessions shared by every connection; requests are handled one at a time on the loop """
+    def __init__(self):
+        self.sessions = {}
+        self.next_id = 1
+        self.requests = 0
+        self.steps = 0
+
+    def new_seed(self, has_seed, seed):
+        return int(seed) if has_seed else random.getrandbits(32)
+
+    def lookup(self, ids):
+        try: return [self.sessions[i] for i in ids]
+        except KeyError as e: raise ProtocolError(f"unknown session {e.args[0]}")
+
+    def states(self, ids, sessions, observe):
+        """ STATE records for sessions, followed by their observation grids if asked """
+        out = np.empty(len(ids), dtype=STATE)
+        out["session"] = ids
+        out["reward"] = [s.last_reward for s in sessions]
+        out["done"] = [s.state.game_over for s in sessions]
+        out["frame"] = [s.state.frame for s in sessions]
+        out["score"] = [s.state.score for s in sessions]
+        out["death"] = [DEATH_CAUSES.index(s.state.death_cause) if s.state.death_cause else -1 for s in sessions]
+        if not observe: return out.tobytes()
+        grids = np.empty((len(sessions), CHANNELS, OBS_ROWS, OBS_COLS), dtype=np.float32)
+        for i, s in enumerate(sessions): grids[i] = s.observe()
+        return out.tobytes() + grids.tobytes()
+
+    def handle(self, payload):
+        """ One request payload -> one response payload """
+        if len(payload) < HEADER.size: raise ProtocolError("short header")
+        op, flags, count = HEADER.unpack_from(payload)
+        self.requests += 1
+        if op == OP_INFO:
+            return HEADER.pack(op, 0, 1) + INFO.pack(PROTOCOL_VERSION, CHANNELS, OBS_ROWS, OBS_COLS)
+        item = REQUEST_ITEMS.get(op)
+        if item is None: raise ProtocolError(f"unknown op {op}")
+        n_items = 1 if op == OP_CREATE else count
+        if len(payload) != HEADER.size + n_items * item.itemsize:
+            raise ProtocolError(f"op {op}: expected {n_items} items of {item.itemsize} bytes")
+        items = np.frombuffer(payload, dtype=item, count=n_items, offset=HEADER.size)
+
+        if op == OP_CREATE:
+            has_seed, seed = items[0]
+            ids = list(range(self.next_id, self.next_id + count))
+            self.next_id += count
+            for i, sid in enumerate(ids):
+                self.sessions[sid] = Session(self.new_seed(has_seed, seed + i))
+            return HEADER.pack(op, 0, count) + np.array(ids, dtype="<u4").tobytes()
+
+        ids = items["session"].tolist()
+        sessions = self.lookup(ids)
+        if op == OP_RESET:
+            for s, has_seed, seed in zip(sessions, items["has_seed"].tolist(), items["seed"].tolist()):
+                s.state.reset(self.new_seed(has_seed, seed))
+                s.observer = None # the old grid is of the previous game
+                s.last_reward = 0
+            return HEADER.pack(op, 0, count) + self.states(ids, sessions, False)
+        if op == OP_STEP:
+            actions = items["action"].tolist()
+            if actions and max(actions) > ACTION_DOWN: raise ProtocolError("bad action")
+            for s, action in zip(sessions, actions):
+                s.last_reward = s.state.step(action)[0]
+            self.steps += count
+            observe = bool(flags & FLAG_OBSERVE)
+            return HEADER.pack(op, flags & FLAG_OBSERVE, count) + self.states(ids, sessions, observe)
+        if op == OP_OBSERVE:
+            return HEADER.pack(op, FLAG_OBSERVE, count) + self.states(ids, sessions, True)
+        if len(set(ids)) != len(ids): raise ProtocolError("session closed twice")
+        for sid in ids: del self.sessions[sid]
+        return HEADER.pack(op, 0, count)
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                try: size, = FRAME.unpack(await reader.readexactly(FRAME.size))
+                except asyncio.IncompleteReadError: break
+                if size > MAX_FRAME: break
+                payload = await reader.readexactly(size)
+                try: response = self.handle(payload)
+                except ProtocolError as e:
+                    response = HEADER.pack(OP_ERROR, 0, 0) + str(e).encode()
+                except Exception as e: # a server bug: report it and keep the connection
+                    traceback.print_exc()
+                    response = HEADER.pack(OP_ERROR, 0, 0) + f"{type(e).__name__}: {e}".encode()
+                writer.write(FRAME.pack(len(response)) + response)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self, unix=None, host="127.0.0.1", port=DEFAULT_PORT):
+        if unix:
+            if os.path.exists(unix): os.unlink(unix)
+            server = await asyncio.start_unix_server(self.serve_client, path=unix)
+        else:
+            server = await asyncio.start_server(self.serve_client, host, port)
+        print(f"serving on {unix or f'{host}:{port}'}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+# --- Client ---
+
+class Client:
+    """ Blocking client. Session results come back as NumPy record arrays of dtype STATE """
+    def __init__(self, unix=None, host="127.0.0.1", port=DEFAULT_PORT):
+        if unix:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix)
+        else:
+            self.sock = socket.create_connection((host, port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def close(self):
+        self.sock.close()
+
+    def recv_exactly(self, size):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        got = 0
+        while got < size:
+            n = self.sock.recv_into(view[got:])
+            if not n: raise ConnectionError("server closed the connection")
+            got += n
+        return buf
+
+    def request(self, op, count, items=b"", flags=0):
+        payload = HEADER.pack(op, flags, count) + items
+        self.sock.sendall(FRAME.pack(len(payload)) + payload)
+        size, = FRAME.unpack(self.recv_exactly(FRAME.size))
+        response = self.recv_exactly(size)
+        r_op, r_flags, r_count = HEADER.unpack_from(response)
+        if r_op == OP_ERROR: raise ProtocolError(bytes(response[HEADER.size:]).decode())
+        return r_flags, r_count, memoryview(response)[HEADER.size:]
+
+    def decode_states(self, flags, count, body):
+        states = np.frombuffer(body, dtype=STATE, count=count)
+        if not flags & FLAG_OBSERVE: return states, None
+        grids = np.frombuffer(body, dtype=np.float32, offset=count * STATE.itemsize)
+        return states, grids.reshape(count, CHANNELS, OBS_ROWS, OBS_COLS)
+
+    def info(self):
+        _, _, body = self.request(OP_INFO, 0)
+        return INFO.unpack_from(body)
+
+    def create(self, count, seed=None):
+        """ Starts count sessions (seeded seed, seed + 1, ... if given); returns their ids """
+        item = np.array([(seed is not None, seed or 0)], dtype=CREATE_ITEM)
+        _, n, body = self.request(OP_CREATE, count, item.tobytes())
+        return np.frombuffer(body, dtype="<u4", count=n)
+
+    def reset(self, sessions, seeds=None):
+        items = np.zeros(len(sessions), dtype=RESET_ITEM)
+        items["session"] = sessions
+        if seeds is not None:
+            items["has_seed"] = 1
+            items["seed"] = seeds
+        return self.decode_states(*self.request(OP_RESET, len(sessions), items.tobytes()))[0]
+
+    def step(self, sessions, actions, observe=False):
+        """ One frame for every session; returns (states, grids or None) """
+        items = np.empty(len(sessions), dtype=STEP_ITEM)
+        items["session"] = sessions
+        items["action"] = actions
+        return self.decode_states(*self.request(OP_STEP, len(sessions), items.tobytes(),
+                                                FLAG_OBSERVE if observe else 0))
+
+    def observe(self, sessions):
+        items = np.asarray(sessions, dtype="<u4")
+        return self.decode_states(*self.request(OP_OBSERVE, len(items), items.tobytes()))
+
+    def close_sessions(self, sessions):
+        items = np.asarray(sessions, dtype="<u4")
+        self.request(OP_CLOSE, len(items), items.tobytes())
+
+# --- Load generator ---
+
+def load_client(address, sessions, requests, observe, seed, latencies):
+    """ One connection stepping its own sessions with a hop-forward policy, resetting the dead """
+    client = Client(**address)
+    ids = client.create(sessions, seed)
+    rng = np.random.default_rng(seed)
+    dead = np.zeros(sessions, dtype=bool)
+    for _ in range(requests):
+        actions = np.where(rng.random(sessions) < 0.08, 3, 0).astype(np.uint8)
+        if dead.any(): client.reset(ids[dead])
+        start = time.perf_counter()
+        states, _ = client.step(ids, actions, observe)
+        latencies.append(time.perf_counter() - start)
+        dead = states["done"].astype(bool)
+    client.close_sessions(ids)
+    client.close()
+
+def wait_for_server(address, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try: return Client(**address)
+        except OSError:
+            if time.perf_counter() > deadline: raise
+            time.sleep(0.05)
+
+def loadgen(address, clients, sessions, requests, observe):
+    latencies = [[] for _ in range(clients)]
+    threads = [threading.Thread(target=load_client, args=(address, sessions, requests, observe, 1000 * i, latencies[i]))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    all_latencies = sorted(l for client in latencies for l in client)
+    steps = clients * sessions * requests
+    return {
+        "requests_per_sec": len(all_latencies) / elapsed,
+        "steps_per_sec": steps / elapsed,
+        "p50_ms": percentile(all_latencies, 0.50) * 1000,
+        "p99_ms": percentile(all_latencies, 0.99) * 1000,
+        "us_per_step": percentile(all_latencies, 0.50) * 1e6 / sessions,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless game server for external agents")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "loadgen"):
+        p = sub.add_parser(name)
+        p.add_argument("--unix", metavar="PATH", help="Unix domain socket (default: localhost TCP)")
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    load = sub.choices["loadgen"]
+    load.add_argument("--spawn", action="store_true", help="start a server subprocess for the run")
+    load.add_argument("--clients", type=int, default=4)
+    load.add_argument("--sessions", type=int, default=64, help="sessions stepped per request")
+    load.add_argument("--requests", type=int, default=1000, help="step requests per client")
+    load.add_argument("--observe", action="store_true", help="return observation grids with every step")
+    args = parser.parse_args(argv)
+
+    address = {"unix": args.unix, "host": args.host, "port": args.port}
+    if args.command == "serve":
+        asyncio.run(GameServer().run(**address))
+        return
+
+    server = None
+    if args.spawn:
+        cmd = [sys.executable, os.path.abspath(__file__), "serve", "--host", args.host, "--port", str(args.port)]
+        if args.unix: cmd += ["--unix", args.unix]
+        server = subprocess.Popen(cmd)
+    try:
+        wait_for_server(address).close()
+        r = loadgen(address, args.clients, args.sessions, args.requests, args.observe)
+    finally:
+        if server is not None: server.terminate()
+    print(f"{args.clients} clients x {args.sessions} sessions x {args.requests} requests"
+          f"{' with observations' if args.observe else ''}")
+    print(f"{r['steps_per_sec']:.0f} session-steps/s, {r['requests_per_sec']:.0f} requests/s, "
+          f"latency p50 {r['p50_ms']:.2f} ms p99 {r['p99_ms']:.2f} ms ({r['us_per_step']:.1f} us/step)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+""" Streaming episode statistics in constant memory, persisted to an append-only file.
+
+EpisodeStats folds finished episodes into fixed-size counters: a fixed-bin score
+histogram, log-bucket quantile sketches for score and survival frames, death causes,
+frames survived and deaths per difficulty level, and the lane-type mix spawned at each
+level. Memory does not grow with the number of episodes, and two EpisodeStats merge by
+adding their counters, so worker processes or separate runs can be combined.
+
+A StatsStore file is a sequence of records, each the compressed counters of the
+episodes added since the previous flush. Loading sums the records, so a summary never
+re-reads raw episodes; compact() folds the records into one.
+
+    python crossy_stats.py summary stats.crst [more.crst ...]
+    python crossy_stats.py compact stats.crst
+"""
+import argparse
+import math
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from crossy_roads import FPS, LANE_TYPES, DEATH_CAUSES
+
+CAUSES = DEATH_CAUSES + ("alive",) # "alive": stopped by a frame limit
+SCORE_BIN_WIDTH = 50
+SCORE_BINS = 400 # The last bin also counts every score past 20000
+MAX_LEVELS = 64 # The last level also counts every level past it
+SKETCH_ACCURACY = 0.01 # Quantiles within 1% of the true value
+SKETCH_BUCKETS = 1200 # Covers values up to ~2e10
+
+MAGIC = b"CRST"
+VERSION = 1
+RECORD = struct.Struct("<4sHI") # magic, version, compressed payload length
+
+class QuantileSketch:
+    """ Relative-error quantiles from log-spaced buckets (values >= 0). Two sketches merge
+        by adding their bucket counts """
+    gamma = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(SKETCH_BUCKETS, dtype=np.int64) if counts is None else counts
+
+    def add(self, value):
+        """ Bucket 0 holds values below 1, bucket i values in (gamma^(i-1), gamma^i] """
+        index = 0 if value < 1 else min(SKETCH_BUCKETS - 1, 1 + math.ceil(math.log(value) / self.log_gamma))
+        self.counts[index] += 1
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def quantile(self, q):
+        total = int(self.counts.sum())
+        if not total: return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), q * (total - 1), side="right"))
+        if index == 0: return 0.0
+        return 2 * self.gamma ** (index - 1) / (1 + self.gamma) # bucket midpoint in relative terms
+
+class EpisodeStats:
+    """ Aggregate of any number of episodes in fixed-size NumPy counters """
+    def __init__(self):
+        self.totals = np.zeros(3, dtype=np.int64) # episodes, score sum, frames sum
+        self.max_score = 0
+        self.score_hist = np.zeros(SCORE_BINS, dtype=np.int64)
+        self.score_sketch = QuantileSketch()
+        self.frames_sketch = QuantileSketch()
+        self.causes = np.zeros(len(CAUSES), dtype=np.int64)
+        self.level_reached = np.zeros(MAX_LEVELS, dtype=np.int64) # episodes that played the level
+        self.level_deaths = np.zeros(MAX_LEVELS, dtype=np.int64)
+        self.level_frames = np.zeros(MAX_LEVELS, dtype=np.int64) # frames played at the level
+        self.lane_mix = np.zeros((MAX_LEVELS, len(LANE_TYPES)), dtype=np.int64)
+
+    @property
+    def episodes(self):
+        return int(self.totals[0])
+
+    def add(self, score, frames, death_cause, level_frames=(), lane_mix=()):
+        """ One finished episode. level_frames[L] is frames played at level L and lane_mix[L]
+            lanes spawned per LANE_TYPES type at L, as kept by GameState """
+        self.totals += (1, score, frames)
+        self.max_score = max(self.max_score, score)
+        self.score_hist[min(SCORE_BINS - 1, score // SCORE_BIN_WIDTH)] += 1
+        self.score_sketch.add(score)
+        self.frames_sketch.add(frames)
+        self.causes[CAUSES.index(death_cause or "alive")] += 1
+        for level, n in enumerate(level_frames):
+            level = min(level, MAX_LEVELS - 1)
+            if n: self.level_reached[level] += 1
+            self.level_frames[level] += n
+        if death_cause is not None and level_frames:
+            self.level_deaths[min(len(level_frames) - 1, MAX_LEVELS - 1)] += 1
+        for level, counts in enumerate(lane_mix):
+            self.lane_mix[min(level, MAX_LEVELS - 1)] += counts
+
+    def add_state(self, state):
+        """ A finished GameState """
+        self.add(state.score, state.frame, state.death_cause, state.level_frames, state.lane_mix)
+
+    def add_record(self, rec):
+        """ A crossy_runner result dict """
+        self.add(rec["score"], rec["steps"], rec["death_cause"], rec.get("level_frames", ()), rec.get("lane_mix", ()))
+
+    def merge(self, other):
+        for name, value in self.arrays().items(): value += other.arrays()[name]
+        self.max_score = max(self.max_score, other.max_score)
+        return self
+
+    def arrays(self):
+        return {
+            "totals": self.totals, "score_hist": self.score_hist, "score_sketch": self.score_sketch.counts,
+            "frames_sketch": self.frames_sketch.counts, "causes": self.causes, "level_reached": self.level_reached,
+            "level_deaths": self.level_deaths, "level_frames": self.level_frames, "lane_mix": self.lane_mix,
+        }
+
+    # --- Serialization: every counter in one flat int64 vector with a fixed layout ---
+
+    def to_vector(self):
+        return np.concatenate([[self.max_score]] + [a.ravel() for a in self.arrays().values()])
+
+    @classmethod
+    def from_vector(cls, vector):
+        stats = cls()
+        stats.max_score = int(vector[0])
+        pos = 1
+        for a in stats.arrays().values():
+            a.ravel()[:] = vector[pos:pos + a.size]
+            pos += a.size
+        return stats
+
+    # --- Queries ---
+
+    def summary(self):
+        n = self.episodes
+        levels = np.flatnonzero(self.level_reached)
+        per_level = {}
+        for level in levels.tolist():
+            reached = int(self.level_reached[level])
+            frames = int(self.level_frames[level])
+            deaths = int(self.level_deaths[level])
+            mix = self.lane_mix[level]
+            per_level[level] = {
+                "reached": reached,
+                "deaths": deaths,
+                "mean_seconds": frames / reached / FPS,
+                "deaths_per_minute": deaths / (frames / FPS / 60) if frames else 0.0,
+                "lane_mix": {t: float(mix[i] / mix.sum()) if mix.sum() else 0.0 for i, t in enumerate(LANE_TYPES)},
+            }
+        return {
+            "episodes": n,
+            "mean_score": self.totals[1] / n if n else 0.0,
+            "max_score": self.max_score,
+            "score_quantiles": {q: self.score_sketch.quantile(q) for q in (0.5, 0.9, 0.99)},
+            "mean_seconds": self.totals[2] / n / FPS if n else 0.0,
+            "seconds_quantiles": {q: self.frames_sketch.quantile(q) / FPS for q in (0.5, 0.9, 0.99)},
+            "causes": {c: int(k) for c, k in zip(CAUSES, self.causes) if k},
+            "levels": per_level,
+        }
+
+class StatsStore:
+    """ Append-only file of EpisodeStats deltas; the sum of its records is the total """
+    def __init__(self, path):
+        self.path = path
+        self.tail_checked = False # the file ends on a whole record as far as this store knows
+
+    def append(self, stats):
+        if not stats.episodes: return
+        payload = zlib.compress(stats.to_vector().astype("<i8").tobytes())
+        with open(self.path, "ab") as f:
+            if not self.tail_checked:
+                # A torn last record from an earlier crash would swallow this one. Later
+                # appends skip the scan, and never truncate what another process appended
+                end = 0
+                for _, end in self.records(): pass
+                f.truncate(end)
+            self.tail_checked = False # until this record is safely written
+            f.write(RECORD.pack(MAGIC, VERSION, len(payload)) + payload) # one write per record
+        self.tail_checked = True
+
+    def records(self):
+        """ Yields (payload, end offset) per whole record; a torn last record ends the file """
+        if not os.path.exists(self.path): return
+        with open(self.path, "rb") as f: data = f.read()
+        pos = 0
+        while pos + RECORD.size <= len(data):
+            magic, version, size = RECORD.unpack_from(data, pos)
+            if magic != MAGIC or version != VERSION: raise ValueError(f"{self.path}: not a stats file")
+            payload = data[pos + RECORD.size:pos + RECORD.size + size]
+            if len(payload) < size: break # torn last record from an interrupted flush
+            pos += RECORD.size + size
+            yield payload, pos
+
+    def load(self):
+        """ The sum of every record. Raises ValueError if the file is not a stats file or is corrupt """
+        total = EpisodeStats()
+        for payload, _ in self.records():
+            try: vector = np.frombuffer(zlib.decompress(payload), dtype="<i8")
+            except zlib.error: raise ValueError(f"{self.path}: corrupt record")
+            total.merge(EpisodeStats.from_vector(vector))
+        return total
+
+    def rewrite(self, stats):
+        """ Replaces the file with a single record of stats """
+        tmp = self.path + ".tmp"
+        if os.path.exists(tmp): os.unlink(tmp)
+        StatsStore(tmp).append(stats)
+        if os.path.exists(tmp): os.replace(tmp, self.path)
+        elif os.path.exists(self.path): os.unlink(self.path) # no episodes
+        self.tail_checked = False
+
+    def compact(self):
+        """ Rewrites the file as a single record """
+        total = self.load()
+        self.rewrite(total)
+        return total
+
+def print_summary(s, out=sys.stdout):
+    print(f"{s['episodes']} episodes, mean score {s['mean_score']:.1f}, max {s['max_score']}, "
+          f"p50/p90/p99 {'/'.join(f'{v:.0f}' for v in s['score_quantiles'].values())}", file=out)
+    print(f"survival: mean {s['mean_seconds']:.1f}s, "
+          f"p50/p90/p99 {'/'.join(f'{v:.1f}' for v in s['seconds_quantiles'].values())}s", file=out)
+    print(f"deaths: {s['causes']}", file=out)
+    print(f"{'level':>5}{'reached':>9}{'deaths':>8}{'mean s':>8}{'deaths/min':>11}  lane mix (grass/road/rail)", file=out)
+    for level, row in s["levels"].items():
+        mix = "/".join(f"{row['lane_mix'][t]:.2f}" for t in LANE_TYPES)
+        print(f"{level:>5}{row['reached']:>9}{row['deaths']:>8}{row['mean_seconds']:>8.1f}"
+              f"{row['deaths_per_minute']:>11.2f}  {mix}", file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize or compact episode statistics files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="merge files and print the summary")
+    summary.add_argument("paths", nargs="+")
+    compact = sub.add_parser("compact", help="fold a file's records into one")
+    compact.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        before = os.path.getsize(args.path)
+        StatsStore(args.path).compact()
+        print(f"{args.path}: {before} -> {os.path.getsize(args.path)} bytes")
+        return
+    total = EpisodeStats()
+    for path in args.paths: total.merge(StatsStore(path).load())
+    print_summary(total.summary())
+
+if __name__ == "__main__":
+    main()